@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from types import SimpleNamespace
+from snapshots import DATA_DIR
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+# 'live' calls the APIs, 'record' calls them and saves every response as a fixture,
+# 'replay' serves the saved responses without network access or credentials
+API_MODE = os.environ.get('API_MODE', 'live')
+FIXTURE_DIR = os.environ.get('API_FIXTURE_DIR', os.path.join(DATA_DIR, 'api_fixtures'))
+# Simulated latency of each replayed request (e.g. API_LATENCY_MS=120 to match the live APIs)
+API_LATENCY_MS = float(os.environ.get('API_LATENCY_MS', 0))
+
+# Attributes of the Reddit posts used by the pipeline (see reddit_posts.py)
+POST_ATTRIBUTES = ['id', 'title', 'media', 'over_18', 'created_utc', 'upvote_ratio', 'score']
+# Posts per page of a Reddit listing, one request each
+LISTING_PAGE_SIZE = 100
+
+if API_MODE not in ('live', 'record', 'replay'):
+    raise ValueError("API_MODE must be 'live', 'record' or 'replay', not '%s'" % (API_MODE))
+
+class ReplayedError(Exception):
+    """
+    Raised in replay mode where the recorded call raised an error.
+    """
+
+###---Credentials---###
+
+# Credential value -> placeholder, so recorded calls don't depend on (or contain) the credentials
+_placeholders = {}
+
+def credential(name):
+    """
+    Inputs the name of a setting in 'user_credentials.py' and returns its value.
+    In replay mode, returns a placeholder instead so no credentials are needed.
+    """
+    if API_MODE == 'replay':
+        return '<%s>' % (name)
+    import user_credentials
+    value = getattr(user_credentials, name)
+    _placeholders[value] = '<%s>' % (name)
+
+    return value
+
+###---Fixtures---###
+
+def call_key(service, calls):
+    """
+    Inputs a service name and a list of (method, args, kwargs) calls chained on its client
+    and returns a readable key, e.g. "youtube: videos().list(id='abc', part='snippet').execute()".
+    """
+    def argument(value):
+        return repr(_placeholders.get(value, value) if isinstance(value, str) else value)
+
+    return '%s: %s' % (service, '.'.join('%s(%s)' % (method, ', '.join([argument(arg) for arg in args]
+                                                       + ['%s=%s' % (k, argument(v)) for k, v in sorted(kwargs.items())]))
+                                         for method, args, kwargs in calls))
+
+def fixture_path(key):
+    service = key.split(':')[0]
+    return os.path.join(FIXTURE_DIR, service, hashlib.sha1(key.encode()).hexdigest() + '.json')
+
+def save_fixture(key, fixture):
+    """
+    Inputs a call key and a dictionary with the 'response' (or 'error') and saves it as a fixture.
+    """
+    path = fixture_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = '%s.%s.tmp' % (path, os.getpid())
+    with open(temp_path, 'w') as f:
+        json.dump(dict(fixture, call=key), f, default=str)
+    os.replace(temp_path, path)
+
+def load_fixture(key):
+    """
+    Inputs a call key and returns the recorded response, after the simulated latency.
+    Raises the recorded error if the call failed when it was recorded.
+    """
+    path = fixture_path(key)
+    if not os.path.exists(path):
+        raise LookupError("No recorded response for %s (run with API_MODE=record first)" % (key))
+    with open(path) as f:
+        fixture = json.load(f)
+    time.sleep(API_LATENCY_MS / 1000)
+    if 'error' in fixture:
+        raise ReplayedError(fixture['error'])
+
+    return fixture['response']
+
+###---Record and replay clients---###
+
+class ApiClient:
+    """
+    Stands in for a praw, spotipy or googleapiclient client with the same call shapes. Chained
+    calls (e.g. 'yt.videos().list(...)') are collected until the call that makes the request:
+    'execute' for googleapiclient, 'hot' for praw listings and any method for spotipy.
+    In record mode the request is made on the wrapped client and its response saved.
+    """
+    def __init__(self, service, client=None, request_method=None, calls=()):
+        self._service = service
+        self._client = client
+        self._request_method = request_method
+        self._calls = list(calls)
+
+    def __getattr__(self, method):
+        def call(*args, **kwargs):
+            calls = self._calls + [(method, args, kwargs)]
+            if self._request_method is not None and method != self._request_method:
+                return ApiClient(self._service, self._client, self._request_method, calls)
+            return self._request(calls)
+        return call
+
+    def _live_call(self, calls):
+        result = self._client
+        for method, args, kwargs in calls:
+            result = getattr(result, method)(*args, **kwargs)
+        return result
+
+    def _request(self, calls):
+        key = call_key(self._service, calls)
+        if self._service == 'reddit':
+            return self._listing(key, calls)
+        if API_MODE == 'replay':
+            return load_fixture(key)
+        try:
+            response = self._live_call(calls)
+        except Exception as e:
+            save_fixture(key, {'error': '%s: %s' % (type(e).__name__, e)})
+            raise
+        save_fixture(key, {'response': response})
+        return response
+
+    def _listing(self, key, calls):
+        # Reddit listings are streamed: posts are yielded as they are pulled and the
+        # fixture holds the posts pulled before the pipeline stopped reading
+        if API_MODE == 'replay':
+            for i, post in enumerate(load_fixture(key)):
+                if i and i % LISTING_PAGE_SIZE == 0:
+                    time.sleep(API_LATENCY_MS / 1000)
+                yield SimpleNamespace(**post)
+            return
+        posts = []
+        try:
+            for post in self._live_call(calls):
+                posts.append({attribute: getattr(post, attribute) for attribute in POST_ATTRIBUTES})
+                yield post
+        finally:
+            save_fixture(key, {'response': posts})
+
+def _client(service, make_client, request_method=None):
+    if API_MODE == 'replay':
+        return ApiClient(service, request_method=request_method)
+    client = make_client()
+    if API_MODE == 'record':
+        return ApiClient(service, client, request_method)
+
+    return client
+
+###---Clients used by the pipeline---###
+
+def reddit_client():
+    """
+    Returns a new Reddit API client. praw clients aren't thread-safe, so each subreddit gets its own.
+    """
+    def make_client():
+        import praw
+        return praw.Reddit(client_id=credential('R_CLIENT_ID'), client_secret=credential('R_SECRET_KEY'),
+                           user_agent='scrape-songs/0.0.1')
+
+    return _client('reddit', make_client, request_method='hot')
+
+def spotify_client():
+    """
+    Returns a Spotify API client authenticated with the app's client credentials.
+    """
+    def make_client():
+        import spotipy
+        from spotipy.oauth2 import SpotifyClientCredentials
+        # 429 responses aren't retried by spotipy, the rate limiter honors their Retry-After (see spotify_lookup.py)
+        return spotipy.Spotify(auth_manager=SpotifyClientCredentials(credential('S_CLIENT_ID'), credential('S_SECRET_KEY')),
+                               status_forcelist=(500, 502, 503, 504))
+
+    return _client('spotify', make_client)
+
+def spotify_user_client(scope):
+    """
+    Inputs an authorization scope (e.g. 'playlist-modify-public') and returns
+    a Spotify API client with access to the user's account.
+    """
+    def make_client():
+        import spotipy
+        token = spotipy.util.prompt_for_user_token(credential('S_USERNAME'), scope, client_id=credential('S_CLIENT_ID'),
+                                                   client_secret=credential('S_SECRET_KEY'), redirect_uri=credential('S_REDIRECT_URI'))
+        return spotipy.Spotify(auth=token)
+
+    return _client('spotify_user', make_client)
+
+def youtube_client():
+    """
+    Returns a YouTube Data API v3 client authenticated with the API key.
+    """
+    def make_client():
+        import googleapiclient.discovery
+        return googleapiclient.discovery.build("youtube", "v3", developerKey=credential('Y_API_KEY'))
+
+    return _client('youtube', make_client, request_method='execute')
@@ -1,53 +1,26 @@
-#from secrets import randbelow
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-#from sklearn.preprocessing import MinMaxScaler
+# Keep startup imports light - modules only a single page needs are imported inside that page
+# (run 'python bench_startup.py' to check import time and time to first render)
 import streamlit as st
 from streamlit_option_menu import option_menu
 import streamlit.components.v1 as components
-import pandas as pd
-import datetime
-from datetime import datetime as dt, timedelta
-import os
-import re
-from IPython.display import HTML
-import warnings
-#from pandas.core.common import SettingWithCopyWarning
+from datetime import datetime as dt
+import time
 import logging
+from snapshots import load_snapshot
+from chart_html import load_chart_html
+from thumbnails import EXTREMES_BOX, thumbnail_src
+from manifest import latest_complete_date, snapshot_dates
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
-# Set up warnings
-#warnings.simplefilter(action="ignore", category=SettingWithCopyWarning)
 
 ###---Import data---###
 
-# Get the latest files based on date in the filename 
-files_list = os.listdir(str(os.getcwd()) + '/data')
-
-def get_max_date(list):
-        """
-        Inputs a list of filenames in the 'data' directory and returns the latest date found in the filenames.
-        """
-        max_date = datetime.date.today() - timedelta(days=365)
-
-        for filename in files_list:
-                match = re.findall('\d{4}-\d{2}-\d{2}', filename)
-                try:
-                        date = dt.strptime(match[0], '%Y-%m-%d').date()
-                        if date > max_date:
-                                max_date = date
-                        else:
-                                continue
-                except:
-                        continue
-                
-        return str(max_date)
-
-# Since app is frozen in time - set latest date to a hardcoded date
-#latest_date = get_max_date(files_list)
-latest_date = '2023-03-13'
+# Latest day with every file the app needs, looked up in the manifest written by the pipeline
+# (app is frozen in time - the pipeline no longer adds days)
+latest_date = latest_complete_date()
+# Every archived day that has the charts and extremes, latest first
+archive_dates = snapshot_dates(required=['chart_spotify', 'chart_youtube', 'spotify_extremes'])[::-1]
 
 # Embed links for playlists
 from spotify_links import spotify_embed_src, spotify_playlist_link
@@ -55,25 +28,6 @@ logging.critical("\n---Imported Spotify embed SRC string---\n")
 from youtube_links import youtube_embed_src1, youtube_embed_src2, playlist_link_1, playlist_link_2
 logging.critical("\n---Imported YouTube embed SRC and link strings---\n")
 
-# REDDIT
-top_songs = pd.read_csv('data/reddit_top_150_songs_%s.csv' % (latest_date))
-logging.critical("\n---DataFrame created from import 'reddit_top_150_songs_%s.csv'---\n" % (latest_date))
-# SPOTIFY
-song_data = pd.read_csv('data/spotify_song_data_%s.csv' % (latest_date))
-logging.critical("\n---DataFrame created from import 'spotify_song_data_%s.csv'---\n" % (latest_date))
-sp = pd.read_csv('data/spotify_top_100_songs_%s.csv' % (latest_date))
-logging.critical("\n---DataFrame created from import 'spotify_top_100_song_%s.csv'---\n" % (latest_date))
-min_max = pd.read_csv('data/spotify_extremes_%s.csv' % (latest_date))
-logging.critical("\n---DataFrame created from import 'spotify_extremes_%s.csv'---\n" % (latest_date))
-
-# Charts
-chart_top_100 = pd.read_csv('data/chart_reddit_%s.csv' % (latest_date))
-logging.critical("\n---DataFrame created from import 'chart_reddit_%s.csv'---\n" % (latest_date))
-chart_spotify_top_100 = pd.read_csv('data/chart_spotify_%s.csv' % (latest_date))
-logging.critical("\n---DataFrame created from import 'chart_spotify_%s.csv'---\n" % (latest_date))
-chart_youtube_top_100 = pd.read_csv('data/chart_youtube_%s.csv' % (latest_date))
-logging.critical("\n---DataFrame created from import 'chart_youtube_%s.csv'---\n" % (latest_date))
-
 ####---Configure Streamlit---###
 
 # Configuration (browser tab info, layout)
@@ -85,49 +39,32 @@ st.set_page_config(
     layout="wide",
 )
  
-# with st.sidebar:
-#     choose = option_menu("r/ Daily Hot 100", ["Playlists", "Charts",
-#                         "Today's Extremes", "Dashboard", "Feedback"],
-#                          icons=['boombox', 'bar-chart', 'exclamation-circle', 'speedometer', 'chat-text'],
-#                          menu_icon="music-note-beamed",
-#                          default_index=0,
-#                          styles={
-#         "container": {"padding": "5!important", "background-color": "#efefef"},
-#         "icon": {"color": "#222222", "font-size": "16px"}, 
-#         "nav-link": {"color": "#222222", "font-size": "16px", "text-align": "left",
-#         "margin":"0px", "--hover-color": "#DA0037"},
-#         "nav-link-selected": {"color": "#ffffff", "background-color": "#DA0037"},
-#     })
-
 logging.info("\n---Streamlit configured---\n")
 
 ###---Pages---###
 
-st.title("🔥 r/ Daily Hot 100")
-st.subheader("Discover today's hottest songs recommended on Reddit.")
-st.markdown("New playlists and charts generated every day from song posts on [r/Music](%s) and [r/ListenToThis](%s)." % ("https://www.reddit.com/r/Music/", "https://www.reddit.com/r/ListenToThis/"))
-st.markdown("Note: This app is no longer live. Data frozen on March 13, 2023.")
-
-
-tab1, tab2, tab3 = st.tabs(["Playlists", "Charts", "Today's Extremes"])
+REDDIT_LINKS = ("https://www.reddit.com/r/Music/", "https://www.reddit.com/r/ListenToThis/")
 
 ###---Playlist pages---###
-with tab1:
-
-    playlist1, playlist2 = st.tabs(["Spotify Playlist", "YouTube Playlist"])
-
-    with playlist1:
+def show_playlists(date):
+    """
+    Shows the Spotify or YouTube playlist, whichever is selected. Playlists are not archived by date.
+    """
+    playlist = option_menu(None, ["Spotify Playlist", "YouTube Playlist"],
+                           icons=['spotify', 'youtube'], orientation="horizontal")
+
+    if playlist == "Spotify Playlist":
         logging.info("\n---Setting up Spotify Playlist page...---\n")
         st.subheader("Spotify Playlist")
-        st.markdown("Today's most upvoted songs on [r/Music](%s) and [r/ListenToThis](%s) that were found on Spotify." % ("https://www.reddit.com/r/Music/", "https://www.reddit.com/r/ListenToThis/"))
+        st.markdown("Today's most upvoted songs on [r/Music](%s) and [r/ListenToThis](%s) that were found on Spotify." % REDDIT_LINKS)
         st.markdown("[**Save the playlist – new songs every day**](%s)" % (spotify_playlist_link))
         components.iframe(src=spotify_embed_src, width=380, height=640, scrolling=False)
         logging.info("\n---Spotify Playlist page ready---\n")
 
-    with playlist2:
+    else:
         logging.info("\n---Setting up YouTube Playlist page...---\n")
         st.subheader("YouTube Playlists")
-        st.markdown("Today's most upvoted songs on [r/Music](%s) and [r/ListenToThis](%s) that were found on YouTube." % ("https://www.reddit.com/r/Music/", "https://www.reddit.com/r/ListenToThis/"))        
+        st.markdown("Today's most upvoted songs on [r/Music](%s) and [r/ListenToThis](%s) that were found on YouTube." % REDDIT_LINKS)
         st.markdown("##### **Pt.1 (Tracks 1 – 50)**")
         components.iframe(src=youtube_embed_src1,
                         width=560, height=315, scrolling=False)
@@ -140,365 +77,147 @@ with tab1:
         logging.info("\n---YouTube Playlist page ready---\n")
 
 ###---Chart pages---###
-with tab2: 
-    
-    # Format HTML images for charts
-    def image_url_to_html(string):
-        """
-        Inputs url string for an image and returns image html string.
-        """
-        url, hyperlink = string.split(', ')
-
-        return '<a href="' + hyperlink + '"><img src="'+ url + '" style=max-height:124px;"></a>'
-
-
-    chart1, chart2 = st.tabs(["Spotify Chart", "YouTube Chart"])
-
-    with chart1:
-        logging.info("\n---Setting up Spotify Chart page...---\n")
-        st.subheader("r/ Daily Hot 100 – Spotify Chart")
-        st.markdown("Today's most upvoted songs in 'Hot' on [r/Music](%s) and [r/ListenToThis](%s) that were found on Spotify." % ("https://www.reddit.com/r/Music/", "https://www.reddit.com/r/ListenToThis/"))
-        # HTML view of pandas DataFrame chart
-        chart_spotify_top_100.index += 1 # Start chart index at 1
-        # Convert DataFrame to html to display images
-        st.write(HTML(chart_spotify_top_100.to_html(escape=False, 
-                        formatters=dict(Artwork=image_url_to_html))))
-        logging.info("\n---Spotify Chart page ready---\n")
-
-    with chart2:
-        logging.info("\n---Setting up YouTube Chart page...---\n")
-        st.subheader("r/ Daily Hot 100 – YouTube Chart")
-        st.markdown("Today's most upvoted songs in 'Hot' on [r/Music](%s) and [r/ListenToThis](%s) that were found on YouTube." % ("https://www.reddit.com/r/Music/", "https://www.reddit.com/r/ListenToThis/"))
-        # HTML view of pandas DataFrame chart
-        chart_youtube_top_100.index += 1 # Start chart index at 1
-        # Convert DataFrame to html to display images
-        st.write(HTML(chart_youtube_top_100.to_html(escape=False, 
-                        formatters=dict(Thumbnail=image_url_to_html))))
-        logging.info("\n---YouTube Chart page ready---\n")
+def show_charts(date):
+    """
+    Shows the Spotify or YouTube chart of the given date, whichever is selected.
+    """
+    chart = option_menu(None, ["Spotify Chart", "YouTube Chart"],
+                        icons=['spotify', 'youtube'], orientation="horizontal")
+    source = 'Spotify' if chart == "Spotify Chart" else 'YouTube'
+
+    logging.info("\n---Setting up %s Chart page...---\n" % (source))
+    st.subheader("r/ Daily Hot 100 – %s Chart" % (source))
+    st.markdown("Today's most upvoted songs in 'Hot' on [r/Music](%s) and [r/ListenToThis](%s) that were found on %s." % (REDDIT_LINKS + (source,)))
+    # Chart HTML pre-rendered by the pipeline (see chart_html.py)
+    chart_html = load_chart_html('chart_%s' % (source.lower()), date)
+    st.markdown(chart_html, unsafe_allow_html=True)
+    logging.info("\n---%s Chart page ready (%s KB of HTML)---\n" % (source, len(chart_html) // 1024))
 
 ###---Extremes page---###
-with tab3:
+
+# Rows of the spotify_extremes file in page order: (row, max heading, min heading, feature, unit)
+EXTREMES = [(7, "Happiest track", "Least happy track", "Valence", "/ 100"),
+            (0, "Most danceable", "Least danceable", "Danceability", "/ 100"),
+            (8, "Fastest tempo", "Slowest tempo", "Tempo", "bpm"),
+            (1, "Most energetic", "Least energetic", "Energy", "/ 100"),
+            (2, "Loudest", "Softest", "Loudness", "dB"),
+            (3, "Most talky", "Least talky", "Speechiness", "/ 100"),
+            (4, "Most acoustic", "Least acoustic", "Acousticness", "/ 100"),
+            (5, "Most instrumental", "Least instrumental", "Instrumentalness", "/ 100"),
+            (6, "Most likely recorded live", "Least likely recorded live", "Liveness", "/ 100")]
+
+def show_extremes(date):
+    """
+    Shows the tracks with the highest and lowest value of each audio feature on the given date.
+    """
     logging.info("\n---Setting up Today's Extremes page...---\n")
+    min_max = load_snapshot('spotify_extremes', date)
     
     st.subheader("Today's Extremes")
     st.markdown("Every track on Spotify is measured for audio features like danceability and mood. Check out the most extreme tracks on today's Spotify Hot 100.") 
 
-    max1, min1 = st.columns([0.5, 0.5])
-    with max1:
-        # Valence / Happiness
-        # Max
-        st.markdown("##### Happiest track: %s" % (min_max['max_track'][7]))
-        st.markdown("###### Valence: %s / 100" % (min_max['max_value'][7]))
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['max_link'][7]), str(min_max['max_artwork'][7])), 
-                        unsafe_allow_html=True)
-    with min1:
-        # Min 
-        st.markdown(f"##### Least happy track: {min_max['min_track'][7]}")
-        st.markdown(f"###### Valence: {min_max['min_value'][7]} / 100")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['min_link'][7]), str(min_max['min_artwork'][7])), 
-                        unsafe_allow_html=True)
-
-    max2, min2 = st.columns([0.5, 0.5])
-    with max2:
-        # Danceability
-        # Max
-        st.markdown(f"##### Most danceable: {min_max['max_track'][0]}")
-        st.markdown(f"###### Danceability: {min_max['max_value'][0]} / 100")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['max_link'][0]), str(min_max['max_artwork'][0])), 
-                        unsafe_allow_html=True)
-    with min2:
-        # Min 
-        st.markdown(f"##### Least danceable: {min_max['min_track'][0]}")
-        st.markdown(f"###### Danceability: {min_max['min_value'][0]} / 100")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['min_link'][0]), str(min_max['min_artwork'][0])), 
-                        unsafe_allow_html=True)
-    
-    max3, min3 = st.columns([0.5, 0.5])
-    with max3:
-        # Tempo
-        # Max
-        st.markdown(f"##### Fastest tempo: {min_max['max_track'][8]}")
-        st.markdown(f"###### Tempo: {min_max['max_value'][8]} bpm")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['max_link'][8]), str(min_max['max_artwork'][8])), 
-                        unsafe_allow_html=True)
-    with min3:
-        # Min 
-        st.markdown(f"##### Slowest tempo: {min_max['min_track'][8]}")
-        st.markdown(f"###### Tempo: {min_max['min_value'][8]} bpm")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['min_link'][8]), str(min_max['min_artwork'][8])), 
-                        unsafe_allow_html=True)
-        
-    max4, min4 = st.columns([0.5, 0.5])
-    with max4:
-        # Energy
-        # Max
-        st.markdown(f"##### Most energetic: {min_max['max_track'][1]}")
-        st.markdown(f"###### Energy: {min_max['max_value'][1]} / 100")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['max_link'][1]), str(min_max['max_artwork'][1])), 
-                        unsafe_allow_html=True)
-    with min4:
-        # Min 
-        st.markdown(f"##### Least energetic: {min_max['min_track'][1]}")
-        st.markdown(f"###### Energy: {min_max['min_value'][1]} / 100")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['min_link'][1]), str(min_max['min_artwork'][1])), 
-                        unsafe_allow_html=True)
-        
-    max5, min5 = st.columns([0.5, 0.5])
-    with max5:
-        # Loudness
-        # Max
-        st.markdown(f"##### Loudest: {min_max['max_track'][2]}")
-        st.markdown(f"###### Loudness: {min_max['max_value'][2]} dB")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['max_link'][2]), str(min_max['max_artwork'][2])), 
-                        unsafe_allow_html=True)
-    with min5:
-        # Min 
-        st.markdown(f"##### Softest: {min_max['min_track'][2]}")
-        st.markdown(f"###### Loudness: {min_max['min_value'][2]} dB")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['min_link'][2]), str(min_max['min_artwork'][2])), 
-                        unsafe_allow_html=True)
-
-    max6, min6 = st.columns([0.5, 0.5])
-    with max6:
-        # Speechiness
-        # Max
-        st.markdown(f"##### Most talky: {min_max['max_track'][3]}")
-        st.markdown(f"###### Speechiness: {min_max['max_value'][3]} / 100")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['max_link'][3]), str(min_max['max_artwork'][3])), 
-                        unsafe_allow_html=True)
-    with min6:
-        # Min 
-        st.markdown(f"##### Least talky: {min_max['min_track'][3]}")
-        st.markdown(f"###### Speechiness: {min_max['min_value'][3]} / 100")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['min_link'][3]), str(min_max['min_artwork'][3])), 
-                        unsafe_allow_html=True)
-
-    max7, min7 = st.columns([0.5, 0.5])
-    with max7:
-        # Acousticness
-        # Max
-        st.markdown(f"##### Most acoustic: {min_max['max_track'][4]}")
-        st.markdown(f"###### Acousticness: {min_max['max_value'][4]} / 100")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['max_link'][4]), str(min_max['max_artwork'][4])), 
-                        unsafe_allow_html=True)
-    with min7:
-        # Min 
-        st.markdown(f"##### Least acoustic: {min_max['min_track'][4]}")
-        st.markdown(f"###### Acousticness: {min_max['min_value'][4]} / 100")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['min_link'][4]), str(min_max['min_artwork'][4])), 
-                        unsafe_allow_html=True)
-        
-    max8, min8 = st.columns([0.5, 0.5])
-    with max8:
-        # Instrumentalness
-        # Max
-        st.markdown(f"##### Most instrumental: {min_max['max_track'][5]}")
-        st.markdown(f"###### Instrumentalness: {min_max['max_value'][5]} / 100")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['max_link'][5]), str(min_max['max_artwork'][5])), 
-                        unsafe_allow_html=True)
-    with min8:
-        # Min 
-        st.markdown(f"##### Least instrumental: {min_max['min_track'][5]}")
-        st.markdown(f"###### Instrumentalness: {min_max['min_value'][5]} / 100")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['min_link'][5]), str(min_max['min_artwork'][5])), 
-                        unsafe_allow_html=True)
-
-    max9, min9 = st.columns([0.5, 0.5])
-    with max9:
-        # Liveness
-        # Max
-        st.markdown(f"##### Most likely recorded live: {min_max['max_track'][6]}")
-        st.markdown(f"###### Liveness: {min_max['max_value'][6]} / 100")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['max_link'][6]), str(min_max['max_artwork'][6])), 
-                        unsafe_allow_html=True)
-    with min9:
-        # Min 
-        st.markdown(f"##### Least likely recorded live: {min_max['min_track'][6]}")
-        st.markdown(f"###### Liveness: {min_max['min_value'][6]} / 100")
-        st.markdown('''<a href=%s><img src=%s width="380" /></a>''' 
-                        % (str(min_max['min_link'][6]), str(min_max['min_artwork'][6])), 
-                        unsafe_allow_html=True)
+    for row, max_heading, min_heading, feature, unit in EXTREMES:
+        max_column, min_column = st.columns([0.5, 0.5])
+        for column, extreme, heading in [(max_column, 'max', max_heading), (min_column, 'min', min_heading)]:
+            with column:
+                st.markdown("##### %s: %s" % (heading, min_max['%s_track' % extreme][row]))
+                st.markdown("###### %s: %s %s" % (feature, min_max['%s_value' % extreme][row], unit))
+                st.markdown('''<a href=%s><img src=%s width="380" /></a>'''
+                                % (str(min_max['%s_link' % extreme][row]), thumbnail_src(str(min_max['%s_artwork' % extreme][row]), EXTREMES_BOX)),
+                                unsafe_allow_html=True)
     logging.info("\n---Today's Extremes page ready---\n")
 
-
 ###---Dashboard page---###
-# with tab4:
+def show_dashboard(date):
+    """
+    Shows the stats behind the given date's Spotify Hot 100. Aggregates are computed by the
+    pipeline and figures are built once per day and shared (see dashboard.py).
+    """
+    # Only this page needs the Dashboard's data and plotly
+    from dashboard import AVERAGES, load_daily_stats, load_figures
+
+    logging.info("\n---Setting up Dashboard page...---\n")
+    st.title("Dashboard")
+    st.markdown("##### Dive into the stats behind today's Hot 100 songs and artists.")
+    stats = load_daily_stats(date)
+
+    col1, col2 = st.columns([0.3, 0.7])
+    with col1:
+        logging.info("\n---Displaying Average values---\n")
+        st.markdown("#### Today's averages: ")
+
+        st.markdown(f"### {int(stats['r_score_median'])} upvotes")
+        st.markdown("Reddit popularity (median)")
+
+        for column, label, unit, as_int in AVERAGES:
+            mean = stats['means'][column]
+            st.markdown(f"### {int(mean) if as_int else mean} {unit}")
+            st.markdown(label)
+
+    with col2:
+        logging.info("\n---Displaying Dashboard figures...---\n")
+        for fig in load_figures(date):
+            st.plotly_chart(fig)
 
-#     logging.info("\n---Setting up Dashboard page...---\n")
-#     st.title("Dashboard")
-#     st.markdown("##### Dive into the stats behind today's Hot 100 songs and artists.")
-
-#     col1, col2 = st.columns([0.3, 0.7])
-#     with col1:
-#         logging.info("\n---Displaying Average values---\n")
-#         st.markdown("#### Today's averages: ")
+    logging.info("\n---Dashboard page ready---\n")
 
-#         st.markdown(f"### {int(sp['r_score'].median())} upvotes")
-#         st.markdown("Reddit popularity (median)")
+###---Search page---###
+def show_search(date):
+    """
+    Shows every archived day a song or artist was on the Spotify or YouTube chart data.
+    """
+    # Only this page needs the search index (see song_index.py)
+    from song_index import search_songs
+
+    logging.info("\n---Setting up Search page...---\n")
+    st.subheader("Search the archive")
+    st.markdown("Find the days a song, artist or genre was among the songs recommended on Reddit.")
+    query = st.text_input("Song, artist or genre")
+
+    if query:
+        results = search_songs(query)
+        columns = ['Date', 'Source', 'Rank', 'Artist', 'Song', 'Genre(s) on Reddit']
+        st.markdown("%s results (latest first, max. 200)" % (len(results)))
+        st.dataframe({column: [result[i] for result in results] for i, column in enumerate(columns)})
+    logging.info("\n---Search page ready---\n")
+
+###---Navigation---###
+
+# Only the selected page's code runs on a rerun, so only its content is sent to the browser
+PAGES = {"Playlists": show_playlists,
+         "Charts": show_charts,
+         "Today's Extremes": show_extremes,
+         "Dashboard": show_dashboard,
+         "Search": show_search}
+
+with st.sidebar:
+    choose = option_menu("r/ Daily Hot 100", list(PAGES),
+                         icons=['boombox', 'bar-chart', 'exclamation-circle', 'speedometer', 'search'],
+                         menu_icon="music-note-beamed",
+                         default_index=0,
+                         styles={
+        "container": {"padding": "5!important", "background-color": "#efefef"},
+        "icon": {"color": "#222222", "font-size": "16px"}, 
+        "nav-link": {"color": "#222222", "font-size": "16px", "text-align": "left",
+        "margin":"0px", "--hover-color": "#DA0037"},
+        "nav-link-selected": {"color": "#ffffff", "background-color": "#DA0037"},
+    })
+
+    # Browse the archive - a day's files are only loaded when it is selected
+    # and only the most recently viewed days are kept in memory (see snapshots.py)
+    selected_date = st.selectbox("Chart date", archive_dates, index=archive_dates.index(latest_date),
+                                    format_func=lambda date: dt.strptime(date, '%Y-%m-%d').strftime('%B %d, %Y'))
 
-#         st.markdown(f"### {sp['sp_popularity'].mean()} / 100")
-#         st.markdown("Spotify popularity")
-        
-#         st.markdown(f"### {int(sp['valence'].mean())} / 100")
-#         st.markdown("Valence (song happiness)")
-        
-#         st.markdown(f"### {int(sp['tempo'].mean())} bpm")
-#         st.markdown("Tempo")
-        
-#         st.markdown(f"### {int(sp['energy'].mean())} / 100")
-#         st.markdown("Energy")
+st.title("🔥 r/ Daily Hot 100")
+st.subheader("Discover today's hottest songs recommended on Reddit.")
+st.markdown("New playlists and charts generated every day from song posts on [r/Music](%s) and [r/ListenToThis](%s)." % REDDIT_LINKS)
+st.markdown("Note: This app is no longer live. Data frozen on March 13, 2023.")
 
-#         st.markdown(f"### {int(sp['danceability'].mean())} / 100")
-#         st.markdown("Danceability")
-        
-#         st.markdown(f"### {int(sp['loudness'].mean())} dB")
-#         st.markdown("Loudness")
-
-#         st.markdown(f"### {int(sp['speechiness'].mean())} / 100")
-#         st.markdown("Speechiness (talking vs. melodic)")
-
-#         st.markdown(f"### {int(sp['acousticness'].mean())} / 100")
-#         st.markdown("Acousticness")
-
-#         st.markdown(f"### {int(sp['instrumentalness'].mean())} / 100")
-#         st.markdown("Instrumentalness (instruments vs. vocals)")
-
-#         st.markdown(f"### {int(sp['liveness'].mean())} / 100")
-#         st.markdown("Liveness (live  audience detection)")
-
-#     with col2:
-#         # Scatterplot Reddit upvotes by mood
-#         logging.info("\n---Displaying Scatterplot Reddit upvotes by mood...---\n")
-#         fig1 = px.scatter(sp, x='tempo', y='valence', color='danceability',
-#                         hover_name="r_title", hover_data=["r_genres", "sp_popularity"],
-#                         size="r_score", size_max=55,
-#                         title='Popularity of song by mood, i.e. valence vs. tempo (size shows popularity)',
-#                         labels={
-#                             "sp_popularity": "Spotify popularity (0-100)",
-#                             "r_score": "Reddit upvotes",
-#                             "valence": "Valence / Happiness (0-100)",
-#                             "tempo": "Tempo (bpm)",
-#                             "r_genres": "Genres",
-#                             "danceability": "Song danceability (0-100)"
-#                         })
-#         st.write(fig1)
-            
-#         # Histogram release years
-#         logging.info("\n---Displaying Histogram release years...---\n")
-#         decades = []
-#         for year in sp['sp_release_year']:
-#             decade = int(np.floor(year / 10) * 10)
-#             decades.append(decade)
-                    
-#         bins_decades=len(set(decades))
-#         fig6 = px.histogram(sp,
-#                             x='sp_release_year',
-#                             nbins=bins_decades,
-#                             title="Number of songs by decade",
-#                             labels={
-#                             "count": "Count",
-#                             "sp_release_year": "Release year"
-#                             })
-#         st.write(fig6)
-        
-#         # Pie chart explicit tracks
-#         logging.info("\n---Displaying Pie chart explicit tracks...---\n")
-#         values = sp['sp_explicit'].value_counts()
-#         names = ['not explicit', 'explicit']
-#         fig2 = px.pie(sp, 
-#                         values=values, 
-#                         names=names, 
-#                         title="Percentage of explicit songs"
-#                     )
-#         st.write(fig2)
-
-#         # Bar plot Key signature vs. Spotify popularity
-#         logging.info("\n---Displaying Bar plot Key signature vs. Spotify popularity...---\n")
-#         fig3 = px.bar(sp, x="key", y="sp_popularity", color='r_score', orientation='v',
-#                     hover_data=["r_title", "r_score"],
-#                     height=400,
-#                     title='Song popularity per key signature',
-#                     labels={
-#                             "sp_popularity": "Spotify popularity score (0-100)",
-#                             "r_score": "Reddit upvotes",
-#                             "key": "Key signature"
-#                         })
-#         st.write(fig3)
-
-#         # # Map of song tempo by country
-#         # logging.info("\n---Displaying Map of song tempo by country...---\n")
-#         # fig4 = px.choropleth(countries,
-#         #                     locations="country_ISO-3", 
-#         #                     locationmode="ISO-3", 
-#         #                     scope="world",
-#         #                     color="tempo",
-#         #                     color_continuous_scale="Viridis_r",
-#         #                     title="Average song tempo by country",
-#         #                     labels={
-#         #                         "artist_country_ISO-3": "Country",
-#         #                         "tempo": "Song tempo (bpm)"
-#         #                     })
-#         # st.write(fig4)
-
-#         # Most underground vs. mainstream tracks
-#         logging.info("\n---Displaying Most underground vs. mainstream tracks...---\n")
-#         fig5 = px.scatter(sp, x='sp_artist_popularity', 
-#                     y='sp_popularity', 
-#                     color='sp_follower_count',
-#                     hover_name="r_title",
-#                     hover_data=['sp_genres'],
-#                     title='Most underground (lower left) vs. mainstream tracks (upper right)',
-#                     labels={
-#                         "r_title": "Track",
-#                         "sp_genres": "Genres",
-#                         "sp_popularity": "Spotify song popularity (0-100)",
-#                         "sp_follower_count": "Spotify followers",
-#                         "sp_artist_popularity": "Spotify artist popularity (0-100)"
-#                     })
-#         st.write(fig5)
-
-        # # Reddit upvotes vs. Spotify popularity
-        # logging.info("\n---Displaying Reddit upvotes vs. Spotify popularity...---\n")
-        # scaler = MinMaxScaler()
-        # r_score_normalized = pd.DataFrame(scaler.fit_transform(sp[['r_score']]))
-        # sp_popularity_normalized = pd.DataFrame(scaler.fit_transform(sp[['sp_popularity']]))
-        
-        # x = list(range(1,101))
-        # fig7 = go.Figure()
-        # fig7.add_trace(go.Scatter(
-        #     x=x,
-        #     y=r_score_normalized[0],
-        #     name = 'Reddit upvotes (normalized)', # Style name/legend entry with html tags
-        #     connectgaps=True # override default to connect the gaps
-        # ))
-        # fig7.add_trace(go.Scatter(
-        #     x=x,
-        #     y=sp_popularity_normalized[0],
-        #     name='Spotify popularity (normalized)',
-        # ))
-        # fig7.update_layout(title='Reddit upvotes vs. Spotify popularity score',
-        #                 xaxis_title='Chart position',
-        #                 yaxis_title='Popularity')
-        # st.write(fig7)
+# Time the page so rerun cost can be compared in the logs
+start = time.perf_counter()
+PAGES[choose](selected_date)
+logging.info("\n---Page '%s' rendered in %.1f ms---\n" % (choose, (time.perf_counter() - start) * 1000))
 
-    logging.info("\n---Dashboard page ready---\n")
 
 ###---Feedback page---###
 #with tab5:
@@ -0,0 +1,75 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from formatting import human_format, format_ms
+
+###---Benchmark against the row-by-row loops---###
+
+def _human_format(num):
+    # Previous version of 'human_format', one number at a time - from Stack Overflow rtaft
+    num = float('{:.3g}'.format(num))
+    magnitude = 0
+    while abs(num) >= 1000:
+        magnitude += 1
+        num /= 1000.0
+    return '{}{}'.format('{:f}'.format(num).rstrip('0').rstrip('.'), ['', 'K', 'M', 'B', 'T'][magnitude])
+
+def _format_ms(milliseconds):
+    # Previous version of 'format_ms', one duration at a time
+    milliseconds = int(milliseconds)
+    seconds = str(int((milliseconds/1000)%60))
+    minutes = str(int((milliseconds/(1000*60))%60))
+    return minutes.zfill(2) + ':' + seconds.zfill(2)
+
+def _format_per_row(df):
+    # Previous loops over the rows (without the chained assignment warnings)
+    df = df.copy()
+    df['count_readable'] = None
+    df['duration'] = None
+    for i, row in df.iterrows():
+        df.loc[i, 'duration'] = _format_ms(df['duration_ms'][i])
+        try:
+            df.loc[i, 'count_readable'] = _human_format(int(df['count'][i]))
+        except ValueError:
+            continue
+
+    return df
+
+def sample_columns(rows, seed=0):
+    """
+    Inputs a number of rows and returns a DataFrame of random counts (from 0 to billions,
+    a few missing) and track durations in milliseconds, to format.
+    """
+    random = np.random.default_rng(seed)
+    counts = np.floor(10 ** random.uniform(0, 10, rows))
+    counts[random.random(rows) < 0.05] = np.nan
+
+    return pd.DataFrame({'count': counts, 'duration_ms': random.integers(30000, 600000, rows)})
+
+def compare_format_times(rows=10000):
+    """
+    Inputs a number of rows and returns a dictionary comparing the rows per second of
+    the row-by-row loops and the column functions, after checking both agree.
+    """
+    df = sample_columns(rows)
+
+    start = time.perf_counter()
+    per_row = _format_per_row(df)
+    per_row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns = pd.DataFrame({'count_readable': human_format(df['count']), 'duration': format_ms(df['duration_ms'])})
+    columns_seconds = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(per_row[['count_readable', 'duration']], columns, check_dtype=False)
+
+    return {'rows': rows,
+            'per row (rows/s)': round(rows / per_row_seconds),
+            'columns (rows/s)': round(rows / columns_seconds),
+            'speedup': round(per_row_seconds / columns_seconds, 1)}
+
+if __name__ == '__main__':
+    # Usage: python bench_formatting.py [number of rows, default 10000]
+    for name, value in compare_format_times(int(sys.argv[1]) if len(sys.argv) > 1 else 10000).items():
+        print('%18s  %s' % (name, value))
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Recorded responses stay in the real data folder when the stages run on a temporary one
+FIXTURE_DIR = os.environ.get('API_FIXTURE_DIR', os.path.join(PACKAGE_DIR, 'data', 'api_fixtures'))
+
+# Pipeline stages in the order they run every day
+STAGES = ['reddit_api.py', 'spotify_api.py', 'spotify_playlist.py', 'spotify_extremes_chart.py',
+          'youtube_api.py', 'youtube_playlist.py', 'youtube_chart.py']
+
+###---Stage run times---###
+
+def run_stage(script, mode='replay', latency_ms=0, data_dir=None):
+    """
+    Inputs a pipeline script, an API mode ('live', 'record' or 'replay'), the simulated latency of
+    replayed requests and the folder for the stage's data files and runs the script in a fresh interpreter.
+    Returns its run time in seconds. Without a data folder, the stage writes today's files in 'data'
+    (and updates its caches and memos) like in a daily run.
+    """
+    env = dict(os.environ, API_MODE=mode, API_LATENCY_MS=str(latency_ms), API_FIXTURE_DIR=FIXTURE_DIR)
+    if data_dir is not None:
+        env['DATA_DIR'] = data_dir
+    start = time.perf_counter()
+    subprocess.run([sys.executable, script], cwd=PACKAGE_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    return time.perf_counter() - start
+
+if __name__ == '__main__':
+    # Usage: python bench_pipeline.py [replay|record|live] [latency ms] [stage.py ...]
+    # Record once (API_MODE=record) with network access, then replay offline as often as needed.
+    # Recorded and replayed runs start from an empty temporary data folder, so every run makes the
+    # same calls (no cache or memo carried over) and the files in 'data' are left untouched
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'replay'
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    stages = sys.argv[3:] or STAGES
+    data_dir = None if mode == 'live' else tempfile.mkdtemp(prefix='bench_pipeline_')
+
+    total = 0
+    try:
+        for script in stages:
+            seconds = run_stage(script, mode, latency_ms, data_dir)
+            total += seconds
+            print('%8.2f s  %s' % (seconds, script))
+    finally:
+        if data_dir is not None:
+            shutil.rmtree(data_dir)
+    print('%8.2f s  total (%s, %s ms simulated latency)' % (total, mode, latency_ms))
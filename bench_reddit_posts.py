@@ -0,0 +1,72 @@
+import sys
+import time
+import datetime
+from types import SimpleNamespace
+import pandas as pd
+from snapshots import read_snapshot
+from reddit_links import read_media
+from reddit_posts import is_song_post, post_record, posts_to_frame, stream_song_posts
+
+###---Benchmark on recorded listings---###
+
+def recorded_listing(date, subreddit_name, length=500):
+    """
+    Inputs a date string and a subreddit name and returns a list of post objects rebuilt from
+    that day's archived raw data, padded with non-media posts to the length of a 'hot' listing.
+    """
+    raw = read_snapshot('reddit_r-%s_raw_data' % (subreddit_name), date)
+    posts = [SimpleNamespace(id='%s%s' % (subreddit_name, row.Index), title=row.r_title, media=read_media(row.r_media_data), over_18=False,
+                             created_utc=datetime.datetime.strptime(row.r_post_date, '%Y-%m-%d').timestamp(),
+                             upvote_ratio=row.r_upvote_ratio, score=row.r_score)
+             for row in raw.itertuples()]
+    # Spread text/image posts evenly between the song posts
+    fillers = max(length - len(posts), 0)
+    listing = []
+    for i, post in enumerate(posts):
+        listing.extend(SimpleNamespace(title='', media=None, over_18=False) for _ in range(fillers * (i + 1) // len(posts) - fillers * i // len(posts)))
+        listing.append(post)
+
+    return listing
+
+def _concat_per_post(listing, quota=150):
+    # Previous version of 'get_reddit_data': one concat per post and the whole listing is read
+    df = pd.DataFrame()
+    pulled = 0
+    for post in listing:
+        pulled += 1
+        if is_song_post(post) and len(df) < quota:
+            df = pd.concat([df, pd.DataFrame([post_record(post)])], ignore_index=True)
+
+    return df, pulled
+
+def _streamed(listing, quota=150):
+    pulled = []
+    counted = (pulled.append(post) or post for post in listing) # count posts pulled from the listing
+
+    return posts_to_frame(stream_song_posts(counted, quota)), len(pulled)
+
+def compare_collection_times(date, subreddit_names=('music', 'listentothis'), quota=150, repeat=5):
+    """
+    Inputs a date string and returns a DataFrame comparing the time and number of posts pulled
+    from the listing when collecting the posts per concat vs. streamed into one frame.
+    """
+    results = []
+    for subreddit_name in subreddit_names:
+        listing = recorded_listing(date, subreddit_name)
+        row = {'subreddit': subreddit_name, 'listing': len(listing)}
+        for name, collect in [('concat', _concat_per_post), ('streamed', _streamed)]:
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                df, pulled = collect(iter(listing), quota)
+                times.append(time.perf_counter() - start)
+            row.update({'%s_ms' % (name): min(times) * 1000, '%s_pulled' % (name): pulled, '%s_rows' % (name): len(df)})
+        row['speedup'] = row['concat_ms'] / row['streamed_ms']
+        results.append(row)
+
+    return pd.DataFrame(results)
+
+if __name__ == '__main__':
+    # Usage: python bench_reddit_posts.py YYYY-MM-DD [quota]
+    quota = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    print(compare_collection_times(sys.argv[1], quota=quota).round(2).to_string(index=False))
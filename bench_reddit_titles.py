@@ -0,0 +1,92 @@
+import os
+import re
+import sys
+import time
+import logging
+import numpy as np
+import pandas as pd
+from youtube_title_parse import get_artist_title
+from snapshots import DATA_DIR, read_snapshot_file
+from reddit_titles import TITLE_COLUMNS, clean_title, get_reddit_genres, parse_titles
+
+###---Benchmark on archived raw data---###
+
+def _parse_titles_per_row(df):
+    # Previous version of 'get_reddit_artist_song_genres' (without the chained assignment warnings)
+    df = df.reindex(columns = df.columns.tolist() + TITLE_COLUMNS)
+    for i, row in df.iterrows():
+        title = clean_title(df['r_title'][i])
+        media_title = clean_title(df['r_media_title'][i])
+        if type(title) is str and get_artist_title(title):
+            df.loc[i, ['r_post_artist', 'r_post_song']] = get_artist_title(title)
+        if type(media_title) is str and get_artist_title(media_title):
+            df.loc[i, ['r_media_artist', 'r_media_song']] = get_artist_title(media_title)
+        if type(df['r_title'][i]) is str:
+            df.loc[i, 'r_genres'] = get_reddit_genres(df['r_title'][i])
+
+    return df
+
+def archived_raw_data(limit=None):
+    """
+    Returns the archived raw data of every subreddit and day (or the latest 'limit' files) as one DataFrame.
+    """
+    pattern = re.compile(r'^reddit_r-.+_raw_data_\d{4}-\d{2}-\d{2}\.csv$')
+    paths = sorted((os.path.join(DATA_DIR, name) for name in os.listdir(DATA_DIR) if pattern.match(name)),
+                   key=lambda path: path[-14:]) # by date
+    paths = paths[-limit:] if limit else paths
+
+    return pd.concat([read_snapshot_file(path).assign(r_date=path[-14:-4]) for path in paths], ignore_index=True)
+
+def compare_parse_times(limit=20):
+    """
+    Inputs a number of archived raw data files and returns a dictionary comparing
+    the rows per second of row-by-row parsing and column parsing, after checking both agree.
+    """
+    raw = archived_raw_data(limit)[['r_title', 'r_media_title']]
+
+    start = time.perf_counter()
+    per_row = _parse_titles_per_row(raw)[TITLE_COLUMNS]
+    per_row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns = parse_titles(raw)
+    columns_seconds = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(per_row.fillna(np.nan), columns.fillna(np.nan), check_dtype=False)
+    distinct = len(pd.unique(np.concatenate([raw['r_title'].to_numpy(dtype=object), raw['r_media_title'].to_numpy(dtype=object)])))
+
+    return {'rows': len(raw), 'distinct titles': distinct,
+            'per row (rows/s)': round(len(raw) / per_row_seconds),
+            'columns (rows/s)': round(len(raw) / columns_seconds),
+            'speedup': round(per_row_seconds / columns_seconds, 1)}
+
+def replay_memo(limit=None):
+    """
+    Inputs a number of archived days and parses their raw data day by day with one memo,
+    as the daily runs would. Returns a DataFrame of the share of distinct titles found in the memo per day.
+    """
+    raw = archived_raw_data(limit and limit * 2)
+    memo = {}
+    results = []
+
+    for date, day in raw.groupby(raw['r_date']):
+        titles = np.concatenate([day['r_title'].to_numpy(dtype=object), day['r_media_title'].to_numpy(dtype=object)])
+        known = sum(title in memo for title in pd.unique(titles))
+        start = time.perf_counter()
+        parse_titles(day, memo)
+        results.append({'date': date, 'distinct titles': len(pd.unique(titles)), 'hit rate': known / len(pd.unique(titles)),
+                        'ms': (time.perf_counter() - start) * 1000})
+
+    return pd.DataFrame(results)
+
+if __name__ == '__main__':
+    # Usage: python bench_reddit_titles.py [number of raw data files, default 20]
+    #        python bench_reddit_titles.py --memo [number of days] - hit rates of the title memo over the archive
+    if sys.argv[1:2] == ['--memo']:
+        logging.getLogger().setLevel(logging.WARNING)
+        replay = replay_memo(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+        print(replay.round(2).to_string(index=False))
+        print('mean hit rate after the first day: %.0f%%' % (replay['hit rate'][1:].mean() * 100))
+    else:
+        for name, value in compare_parse_times(int(sys.argv[1]) if len(sys.argv) > 1 else 20).items():
+            print('%18s  %s' % (name, value))
@@ -0,0 +1,104 @@
+import os
+import sys
+import json
+import subprocess
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Pages of the sidebar menu, the first one is shown when the app opens
+PAGES = ["Playlists", "Charts", "Today's Extremes", "Dashboard", "Search"]
+
+# Runs app.py like Streamlit's script runner does for one browser session: the script runs with a
+# session context whose messages are serialized as they would be sent over the websocket, including
+# Streamlit's message cache (a message the browser already has is sent as a reference to its hash).
+# The sidebar menu is replaced by one returning the page to show. Prints a JSON list with the
+# run time and bytes sent of each run.
+SESSION_RUNNER = '''
+import json, runpy, sys, time
+import streamlit_option_menu
+from streamlit.scriptrunner import ScriptRunContext, add_script_run_ctx
+from streamlit.state import SafeSessionState, SessionState
+from streamlit.uploaded_file_manager import UploadedFileManager
+from streamlit.proto.WidgetStates_pb2 import WidgetStates
+from streamlit.forward_msg_cache import populate_hash_if_needed, create_reference_msg
+from streamlit.server.server_util import is_cacheable_msg, serialize_forward_msg
+
+selected = None
+def option_menu(menu_title, options, default_index=0, **kwargs):
+    return selected if selected in options else options[default_index]
+streamlit_option_menu.option_menu = option_menu
+
+sent = []
+cached = set()
+def enqueue(msg):
+    msg.metadata.cacheable = is_cacheable_msg(msg)
+    if msg.metadata.cacheable:
+        populate_hash_if_needed(msg)
+        if msg.hash in cached:
+            msg = create_reference_msg(msg)
+        else:
+            cached.add(msg.hash)
+    sent.append(len(serialize_forward_msg(msg)))
+
+session_state = SafeSessionState(SessionState())
+ctx = ScriptRunContext(session_id='bench', enqueue=enqueue, query_string='', session_state=session_state,
+                       uploaded_file_mgr=UploadedFileManager(), page_script_hash='', user_info={'email': 'test@example.com'})
+add_script_run_ctx(ctx=ctx)
+
+runs = []
+for page in json.loads(sys.argv[1]):
+    selected = page
+    ctx.reset()
+    session_state.on_script_will_rerun(WidgetStates())
+    del sent[:]
+    start = time.perf_counter()
+    runpy.run_path('app.py', run_name='__main__')
+    runs.append({'page': page, 'seconds': time.perf_counter() - start, 'bytes': sum(sent), 'messages': len(sent)})
+print(json.dumps(runs))
+'''
+
+###---Rerun time and payload---###
+
+def run_session(pages, app_dir=PACKAGE_DIR):
+    """
+    Inputs a list of pages to show one after the other in a single session (the first run opens
+    the app) and the folder of the app to run, and returns a list of dictionaries with the
+    'seconds' and 'bytes' sent to the browser of each run.
+    """
+    result = subprocess.run([sys.executable, '-c', SESSION_RUNNER, json.dumps(pages)],
+                            cwd=app_dir, capture_output=True, text=True, check=True)
+
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def measure_open(app_dir=PACKAGE_DIR):
+    """
+    Returns a dictionary with the bytes sent and the run time in milliseconds of the
+    first run of a session, when the app is opened (on the first page).
+    """
+    run = run_session([PAGES[0]], app_dir)[0]
+
+    return {'open (KB)': round(run['bytes'] / 1024, 1), 'open (ms)': round(run['seconds'] * 1000, 1)}
+
+def measure_page(page, app_dir=PACKAGE_DIR, reruns=5):
+    """
+    Inputs a page name and returns a dictionary with the bytes sent when the page is opened from
+    the first page, the bytes sent when it reruns (e.g. after a widget change on it) and the
+    best rerun time in milliseconds.
+    """
+    runs = run_session([PAGES[0], page] + [page] * reruns, app_dir)
+
+    return {'page': page,
+            'open (KB)': round(runs[1]['bytes'] / 1024, 1),
+            'rerun (KB)': round(runs[-1]['bytes'] / 1024, 1),
+            'rerun (ms)': round(min(run['seconds'] for run in runs[2:]) * 1000, 1)}
+
+if __name__ == '__main__':
+    # Usage: python bench_rerun.py [app folder, default this one]
+    # e.g. compare with an earlier revision checked out with 'git worktree add /tmp/before <commit>'
+    app_dir = sys.argv[1] if len(sys.argv) > 1 else PACKAGE_DIR
+    result = measure_open(app_dir)
+    print('%-18s  open %8.1f KB                  open  %8.1f ms' % ('App', result['open (KB)'], result['open (ms)']))
+    for page in PAGES:
+        result = measure_page(page, app_dir)
+        print('%-18s  open %8.1f KB  rerun %8.1f KB  rerun %8.1f ms'
+              % (page, result['open (KB)'], result['rerun (KB)'], result['rerun (ms)']))
@@ -0,0 +1,124 @@
+import os
+import re
+import sys
+import time
+import logging
+import numpy as np
+import pandas as pd
+from fuzzywuzzy import process as fuzzywuzzy_process
+from snapshots import DATA_DIR, read_snapshot_file
+from song_matching import PROCESSOR, match_scores, best_matches
+from spotify_resolution import CONFIDENT_SCORE
+
+###---Benchmark on archived Spotify raw data---###
+
+def _right_song_per_row(df):
+    # Previous version of 'get_the_right_song' (row by row with fuzzywuzzy, without the chained assignment warnings)
+    df = df.copy()
+    df['match_score'] = None
+    for i, row in df.iterrows():
+        spotify_string = str(df['sp_artist'][i]) + '' + str(df['sp_song'][i])
+        r_post_string = str(df['r_post_artist'][i]) + '' + str(df['r_post_song'][i])
+        r_media_string = str(df['r_media_artist'][i]) + '' + str(df['r_media_song'][i])
+        df.loc[i, 'match_score'] = fuzzywuzzy_process.extractOne(spotify_string, [r_post_string, r_media_string])[1]
+
+    return df
+
+def archived_candidates(limit=None):
+    """
+    Returns the Spotify search results in every archived 'spotify_raw_data' file (or the latest 'limit' files)
+    as one DataFrame, with the post each result was found for in the 'post' column.
+    """
+    pattern = re.compile(r'^spotify_raw_data_\d{4}-\d{2}-\d{2}\.csv$')
+    paths = sorted(os.path.join(DATA_DIR, name) for name in os.listdir(DATA_DIR) if pattern.match(name))
+    paths = paths[-limit:] if limit else paths
+    raw = pd.concat([read_snapshot_file(path).assign(r_date=path[-14:-4]) for path in paths], ignore_index=True)
+    # Several results per post, as compared by 'get_the_right_song'
+    raw = raw.drop_duplicates(['r_date', 'r_title', 'sp_song', 'sp_artist'])
+
+    return raw.assign(post=raw['r_date'] + ' ' + raw['r_title'].astype(str)).reset_index(drop=True)
+
+def _same_artist(results):
+    # Whether each Spotify artist is the artist parsed from the post or media title
+    artist = results['sp_artist'].map(lambda name: PROCESSOR(str(name)))
+    parsed = [results[column].map(lambda name: PROCESSOR(name) if isinstance(name, str) else None)
+              for column in ['r_post_artist', 'r_media_artist']]
+
+    return (artist == parsed[0]) | (artist == parsed[1])
+
+def check_empty_strings():
+    """
+    Checks that names and titles which are missing or empty once processed score 0 against each
+    other, so they can't reach a confident score (e.g. the band '!!!' for a post whose media title
+    wasn't parsed). Raises an AssertionError otherwise.
+    """
+    artists = pd.Series(['!!!', '!!!', 'Drake', 'Drake'])
+    songs = pd.Series(['Heart', 'Heart', 'Nice For What', 'Nice For What'])
+    post = (pd.Series(['!!!', np.nan, 'Drake', 'Drake']), pd.Series(['Heart', np.nan, 'Nice For What', np.nan]))
+    media = (pd.Series([np.nan, '??', None, np.nan]), pd.Series([np.nan, '', None, np.nan]))
+    scores = match_scores(artists, songs, [post, media])
+
+    # Same processed artist but both empty: the song still matches, the artist doesn't
+    assert scores[0] == 50, scores[0]
+    assert scores[1] == 0, scores[1]
+    assert scores[2] == 100, scores[2]
+    assert scores[3] == 50, scores[3]
+
+def compare_match_times(limit=None):
+    """
+    Inputs a number of archived Spotify raw data files and returns a dictionary comparing the results
+    per second of row-by-row and matrix scoring and the songs each picks for posts with several results.
+    """
+    candidates = archived_candidates(limit)
+
+    start = time.perf_counter()
+    per_row = _right_song_per_row(candidates)['match_score'].astype(float)
+    per_row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix = match_scores(candidates['sp_artist'], candidates['sp_song'],
+                          [(candidates['r_post_artist'], candidates['r_post_song']),
+                           (candidates['r_media_artist'], candidates['r_media_song'])])
+    matrix_seconds = time.perf_counter() - start
+
+    several = candidates['post'].duplicated(keep=False)
+    per_row_picks = candidates.loc[best_matches(per_row[several], candidates['post'][several])]
+    matrix_picks = candidates.loc[best_matches(matrix[several], candidates['post'][several])]
+    possible = _same_artist(candidates[several]).groupby(candidates['post'][several]).any().sum()
+
+    return {'results': len(candidates), 'posts with several results': len(per_row_picks),
+            'per row (results/s)': round(len(candidates) / per_row_seconds),
+            'matrix (results/s)': round(len(candidates) / matrix_seconds),
+            'speedup': round(per_row_seconds / matrix_seconds, 1),
+            'same pick': '%.0f%%' % (100 * (per_row_picks.index == matrix_picks.index).mean()),
+            # Picks by the artist parsed from the title, out of the posts where one of the results is by that artist
+            'right artist, per row': '%.0f%%' % (100 * _same_artist(per_row_picks).sum() / possible),
+            'right artist, matrix': '%.0f%%' % (100 * _same_artist(matrix_picks).sum() / possible)}
+
+def confident_share(limit=None, thresholds=(60, 70, CONFIDENT_SCORE, 90)):
+    """
+    Inputs a number of archived Spotify raw data files and returns a DataFrame with, for each score
+    threshold, the number of search results scoring at least that much and the share of them by the
+    artist parsed from the post or media title (see CONFIDENT_SCORE in spotify_resolution.py).
+    """
+    candidates = archived_candidates(limit)
+    scores = match_scores(candidates['sp_artist'], candidates['sp_song'],
+                          [(candidates['r_post_artist'], candidates['r_post_song']),
+                           (candidates['r_media_artist'], candidates['r_media_song'])])
+    same_artist = _same_artist(candidates)
+
+    return pd.DataFrame([{'score at least': threshold, 'results': int((scores >= threshold).sum()),
+                          'same artist': '%.1f%%' % (100 * same_artist[scores >= threshold].mean())}
+                         for threshold in thresholds])
+
+if __name__ == '__main__':
+    # Usage: python bench_song_matching.py [number of raw data files, default all]
+    #        python bench_song_matching.py --confident [number of raw data files] - results by the parsed artist per score
+    # Needs fuzzywuzzy for the previous version (pip install fuzzywuzzy python-Levenshtein), the pipeline doesn't
+    logging.getLogger().setLevel(logging.WARNING)
+    check_empty_strings()
+    if sys.argv[1:2] == ['--confident']:
+        print(confident_share(int(sys.argv[2]) if len(sys.argv) > 2 else None).to_string(index=False))
+    else:
+        for name, value in compare_match_times(int(sys.argv[1]) if len(sys.argv) > 1 else None).items():
+            print('%28s  %s' % (name, value))
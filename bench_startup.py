@@ -0,0 +1,77 @@
+import os
+import ast
+import sys
+import json
+import time
+import subprocess
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+# Runs each of the app's top-level imports in order and reports how long each one took
+IMPORT_TIMER = '''
+import json, sys, time
+timings = []
+for statement in json.loads(sys.argv[1]):
+    start = time.perf_counter()
+    exec(statement)
+    timings.append((statement, time.perf_counter() - start))
+print(json.dumps(timings))
+'''
+
+# Runs app.py once in Streamlit's bare mode (no server, widgets return their defaults)
+FIRST_RENDER = '''
+import runpy, time
+start = time.perf_counter()
+runpy.run_path('app.py', run_name='__main__')
+print(time.perf_counter() - start)
+'''
+
+###---Import time---###
+
+def app_import_statements(path=APP_PATH):
+    """
+    Inputs the path of the app script and returns its module-level import statements as source strings.
+    """
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    tree = ast.parse(source)
+
+    return [ast.get_source_segment(source, node) for node in tree.body
+            if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+def measure_import_times():
+    """
+    Runs the app's top-level imports in a fresh interpreter and returns a list of
+    (statement, seconds) tuples. Modules already loaded by an earlier statement cost nothing.
+    """
+    result = subprocess.run([sys.executable, '-c', IMPORT_TIMER, json.dumps(app_import_statements())],
+                            cwd=os.path.dirname(APP_PATH), capture_output=True, text=True, check=True)
+
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+###---Time to first render---###
+
+def measure_first_render():
+    """
+    Runs app.py once in a fresh interpreter and returns a tuple of seconds:
+    (interpreter start to end of first render, script run time only).
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', FIRST_RENDER],
+                            cwd=os.path.dirname(APP_PATH), capture_output=True, text=True, check=True)
+    total = time.perf_counter() - start
+
+    return total, float(result.stdout.strip().splitlines()[-1])
+
+if __name__ == '__main__':
+    # Usage: python bench_startup.py [runs]
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    import_times = measure_import_times()
+    for statement, seconds in import_times:
+        print('%8.1f ms  %s' % (seconds * 1000, statement))
+    print('%8.1f ms  total import time' % (sum(seconds for _, seconds in import_times) * 1000))
+
+    renders = [measure_first_render() for _ in range(runs)]
+    print('%8.1f ms  time to first render (best of %s, incl. interpreter start)' % (min(total for total, _ in renders) * 1000, runs))
+    print('%8.1f ms  app script run (best of %s)' % (min(script for _, script in renders) * 1000, runs))
@@ -0,0 +1,70 @@
+import os
+from snapshots import snapshot_path, existing_snapshot_path, read_snapshot_file, load_cached
+from thumbnails import CHART_BOX, load_index, thumbnail_src
+
+# Column holding the combined 'image url, link' string for each chart
+IMAGE_COLUMNS = {'chart_reddit': 'Artwork',
+                 'chart_spotify': 'Artwork',
+                 'chart_youtube': 'Thumbnail'}
+
+###---Render chart HTML---###
+
+def image_url_to_html(string, index=None):
+    """
+    Inputs url string for an image and optionally the thumbnail index and returns
+    image html string, using the cached thumbnail if there is one.
+    Lazy loading only applies when the image is linked rather than inlined (see thumbnails.py).
+    """
+    url, hyperlink = string.split(', ')
+
+    return ('<a href="' + hyperlink + '"><img src="' + thumbnail_src(url, CHART_BOX, index) + '"'
+            ' loading="lazy" decoding="async" style="max-height:124px;"></a>')
+
+def render_chart_html(chart_df, image_column):
+    """
+    Inputs a chart DataFrame and the name of its image column and returns the
+    chart as an HTML table with images, numbered from 1. The input is not modified.
+    """
+    chart = chart_df.set_axis(range(1, len(chart_df) + 1), axis=0) # Start chart index at 1
+    index = load_index() # once for the whole table, not once per image
+
+    return chart.to_html(escape=False, formatters={image_column: lambda string: image_url_to_html(string, index)})
+
+def save_chart_html(family, date):
+    """
+    Inputs a chart family and a date string and saves that day's saved chart snapshot
+    rendered as an HTML fragment next to the chart CSV. Returns the file path.
+    """
+    chart_df = read_snapshot_file(existing_snapshot_path(family, date))
+    path = snapshot_path(family, date, 'html')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render_chart_html(chart_df, IMAGE_COLUMNS[family]))
+
+    return path
+
+def chart_image_urls(family, date):
+    """
+    Inputs a chart family and a date string and returns the list of image URLs in that day's chart.
+    """
+    chart_df = read_snapshot_file(existing_snapshot_path(family, date))
+
+    return [string.split(', ')[0] for string in chart_df[IMAGE_COLUMNS[family]].dropna()]
+
+###---Load chart HTML---###
+
+def _read_text(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+def load_chart_html(family, date):
+    """
+    Inputs a chart family and a date string and returns the chart's HTML fragment,
+    read once per process from the file saved by the pipeline. Days archived before
+    fragments were saved are rendered from the chart snapshot once and cached.
+    """
+    html_path = snapshot_path(family, date, 'html')
+    if os.path.exists(html_path):
+        return load_cached(('html', family, date), html_path, _read_text, date)
+
+    return load_cached(('html', family, date), existing_snapshot_path(family, date),
+                       lambda path: render_chart_html(read_snapshot_file(path), IMAGE_COLUMNS[family]), date)
@@ -0,0 +1,136 @@
+import os
+import re
+import sys
+import time
+import pandas as pd
+import logging
+from snapshots import DATA_DIR, snapshot_path, to_columnar, read_snapshot_file
+from chart_html import IMAGE_COLUMNS, save_chart_html
+from manifest import APP_FAMILIES
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+###---Convert the CSV archive to Feather---###
+
+def list_archive():
+    """
+    Returns a list of (family, date) tuples for every snapshot CSV in the 'data' directory.
+    """
+    pattern = re.compile(r'^(.+)_(\d{4}-\d{2}-\d{2})\.csv$')
+    matches = [pattern.match(filename) for filename in sorted(os.listdir(DATA_DIR))]
+
+    return [match.groups() for match in matches if match]
+
+def convert_archive(overwrite=False):
+    """
+    Writes a Feather copy next to every snapshot CSV in the 'data' directory.
+    Existing Feather files are skipped unless overwrite is True or the CSV is newer.
+    Returns the number of files converted.
+    """
+    converted = 0
+
+    for family, date in list_archive():
+        csv_path = snapshot_path(family, date)
+        feather_path = snapshot_path(family, date, 'feather')
+        if (not overwrite and os.path.exists(feather_path)
+                and os.path.getmtime(feather_path) >= os.path.getmtime(csv_path)):
+            continue
+        try:
+            to_columnar(pd.read_csv(csv_path)).to_feather(feather_path)
+            converted += 1
+        except Exception as e:
+            logging.warning("\n---Could not convert '%s': %s---\n" % (os.path.basename(csv_path), e))
+            continue
+
+    logging.info("\n---Converted %s CSV files to Feather---\n" % (converted))
+    return converted
+
+def render_archive_charts(overwrite=False):
+    """
+    Saves a pre-rendered HTML fragment for every archived chart that doesn't have one yet.
+    Returns the number of fragments written.
+    """
+    rendered = 0
+
+    for family, date in list_archive():
+        if family not in IMAGE_COLUMNS:
+            continue
+        if not overwrite and os.path.exists(snapshot_path(family, date, 'html')):
+            continue
+        save_chart_html(family, date)
+        rendered += 1
+
+    logging.info("\n---Rendered %s chart HTML fragments---\n" % (rendered))
+    return rendered
+
+###---Check the Feather copies---###
+
+def check_archive():
+    """
+    Reads every snapshot from CSV and from its Feather copy and checks both give the same
+    DataFrame, including where values are missing and that they are missing as NaN (not None).
+    Returns the list of (family, date) whose copies differ.
+    """
+    different = []
+
+    for family, date in list_archive():
+        feather_path = snapshot_path(family, date, 'feather')
+        if not os.path.exists(feather_path):
+            continue
+        csv_df = read_snapshot_file(snapshot_path(family, date))
+        feather_df = read_snapshot_file(feather_path)
+        try:
+            pd.testing.assert_frame_equal(csv_df, feather_df)
+            # assert_frame_equal treats None and NaN as equal, compare the missing values themselves
+            for df in [csv_df, feather_df]:
+                missing = df.select_dtypes('object').isna()
+                assert all(type(value) is float for column in missing for value in df[column][missing[column]]), \
+                    'missing values that are not NaN'
+            pd.testing.assert_frame_equal(csv_df.isna(), feather_df.isna())
+        except AssertionError as e:
+            logging.warning("\n---Feather copy of '%s_%s' differs from the CSV: %s---\n" % (family, date, e))
+            different.append((family, date))
+
+    logging.info("\n---Checked Feather copies: %s differ from their CSV---\n" % (len(different)))
+    return different
+
+###---Compare read times---###
+
+def compare_read_times(date, families=APP_FAMILIES, repeat=5):
+    """
+    Inputs a date string and returns a DataFrame comparing the best-of-n read time (ms)
+    and in-memory size (KB) of that day's snapshots loaded from CSV vs. Feather.
+    """
+    rows = []
+
+    for family in families:
+        csv_path = snapshot_path(family, date)
+        feather_path = snapshot_path(family, date, 'feather')
+        if not (os.path.exists(csv_path) and os.path.exists(feather_path)):
+            continue
+        row = {'family': family}
+        for fmt, path, reader in [('csv', csv_path, pd.read_csv), ('feather', feather_path, read_snapshot_file)]:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                df = reader(path)
+                timings.append(time.perf_counter() - start)
+            row['%s_ms' % fmt] = round(min(timings) * 1000, 2)
+            row['%s_file_kb' % fmt] = round(os.path.getsize(path) / 1024, 1)
+            row['%s_memory_kb' % fmt] = round(df.memory_usage(deep=True).sum() / 1024, 1)
+        row['speedup'] = round(row['csv_ms'] / row['feather_ms'], 1)
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+if __name__ == '__main__':
+    # Usage: python convert_archive.py [--overwrite] [--charts] [--check] [--benchmark YYYY-MM-DD]
+    convert_archive(overwrite='--overwrite' in sys.argv)
+    if '--charts' in sys.argv:
+        render_archive_charts(overwrite='--overwrite' in sys.argv)
+    if '--check' in sys.argv:
+        check_archive()
+    if '--benchmark' in sys.argv:
+        benchmark_date = sys.argv[sys.argv.index('--benchmark') + 1]
+        print(compare_read_times(benchmark_date).to_string(index=False))
@@ -0,0 +1,170 @@
+import os
+import json
+import logging
+from snapshots import snapshot_path, existing_snapshot_path, read_snapshot, read_snapshot_file, load_cached
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+# Averages shown on the Dashboard: (column, label, unit, show as int)
+AVERAGES = [('sp_popularity', "Spotify popularity", "/ 100", False),
+            ('valence', "Valence (song happiness)", "/ 100", True),
+            ('tempo', "Tempo", "bpm", True),
+            ('energy', "Energy", "/ 100", True),
+            ('danceability', "Danceability", "/ 100", True),
+            ('loudness', "Loudness", "dB", True),
+            ('speechiness', "Speechiness (talking vs. melodic)", "/ 100", True),
+            ('acousticness', "Acousticness", "/ 100", True),
+            ('instrumentalness', "Instrumentalness (instruments vs. vocals)", "/ 100", True),
+            ('liveness', "Liveness (live  audience detection)", "/ 100", True)]
+
+# Audio features scaled to 0-100 in the top 100 songs. Files saved before the scaling was fixed hold
+# each one's right-hand neighbour's values (energy holds loudness x 100, valence holds the upvote ratio x 100)
+PERCENT_FEATURES = ['loudness', 'energy', 'danceability', 'speechiness', 'acousticness',
+                    'instrumentalness', 'liveness', 'valence', 'r_upvote_ratio']
+
+###---Top 100 songs---###
+
+def unshift_features(sp):
+    """
+    Inputs the DataFrame of a day's Spotify top 100 songs and returns it with each audio feature
+    in its own column. Files saved with the shifted scaling (energy below 0, as it held loudness)
+    get each feature back from the column it was written to. Their upvote ratio is lost and left empty.
+    """
+    if not (sp['energy'] < 0).any():
+        return sp
+
+    sp = sp.copy()
+    shifted = sp[PERCENT_FEATURES[2:]].to_numpy()
+    sp[PERCENT_FEATURES[1:-1]] = shifted
+    sp['r_upvote_ratio'] = float('nan')
+
+    return sp
+
+def load_top_100(date):
+    """
+    Inputs a date string and returns that day's Spotify top 100 songs (see 'unshift_features'),
+    read once per process and shared by the daily stats and the figures. Don't modify it in place.
+    """
+    return load_cached(('top 100', date), existing_snapshot_path('spotify_top_100_songs', date),
+                       lambda path: unshift_features(read_snapshot_file(path)), date)
+
+###---Daily stats---###
+
+def compute_daily_stats(sp):
+    """
+    Inputs the DataFrame of a day's Spotify top 100 songs and returns a dictionary
+    of the aggregates shown on the Dashboard.
+    """
+    explicit_counts = sp['sp_explicit'].dropna().astype(str).value_counts()
+
+    return {'r_score_median': float(sp['r_score'].median()),
+            'means': {column: float(sp[column].mean()) for column, _, _, _ in AVERAGES},
+            'decade_count': int((sp['sp_release_year'].dropna() // 10).nunique()),
+            'explicit_counts': {('explicit' if value == 'True' else 'not explicit'): int(count)
+                                for value, count in explicit_counts.items()}}
+
+def save_daily_stats(date):
+    """
+    Inputs a date string and saves the Dashboard aggregates of that day's
+    Spotify top 100 songs as 'data/spotify_stats_<date>.json'. Returns the file path.
+    """
+    path = snapshot_path('spotify_stats', date, 'json')
+    with open(path, 'w') as f:
+        json.dump(compute_daily_stats(unshift_features(read_snapshot('spotify_top_100_songs', date))), f, indent=1)
+
+    return path
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+def load_daily_stats(date):
+    """
+    Inputs a date string and returns the Dashboard aggregates saved by the pipeline for that day,
+    computed once from the top 100 songs for days archived before stats were saved.
+    """
+    stats_path = snapshot_path('spotify_stats', date, 'json')
+    if os.path.exists(stats_path):
+        return load_cached(('stats', date), stats_path, _read_json, date)
+
+    return load_cached(('stats', date), existing_snapshot_path('spotify_top_100_songs', date),
+                       lambda path: compute_daily_stats(load_top_100(date)), date)
+
+###---Dashboard figures---###
+
+def build_figures(sp, stats):
+    """
+    Inputs the DataFrame of a day's Spotify top 100 songs and its daily stats
+    and returns the list of Dashboard figures.
+    """
+    # Only the Dashboard needs plotly, keep it out of the web app's startup imports
+    import plotly.express as px
+
+    # Scatterplot Reddit upvotes by mood
+    fig1 = px.scatter(sp, x='tempo', y='valence', color='danceability',
+                    hover_name="r_title", hover_data=["r_genres", "sp_popularity"],
+                    size="r_score", size_max=55,
+                    title='Popularity of song by mood, i.e. valence vs. tempo (size shows popularity)',
+                    labels={
+                        "sp_popularity": "Spotify popularity (0-100)",
+                        "r_score": "Reddit upvotes",
+                        "valence": "Valence / Happiness (0-100)",
+                        "tempo": "Tempo (bpm)",
+                        "r_genres": "Genres",
+                        "danceability": "Song danceability (0-100)"
+                    })
+
+    # Histogram release years (one bin per decade)
+    fig6 = px.histogram(sp,
+                        x='sp_release_year',
+                        nbins=stats['decade_count'],
+                        title="Number of songs by decade",
+                        labels={
+                        "count": "Count",
+                        "sp_release_year": "Release year"
+                        })
+
+    # Pie chart explicit tracks
+    fig2 = px.pie(values=list(stats['explicit_counts'].values()),
+                    names=list(stats['explicit_counts'].keys()),
+                    title="Percentage of explicit songs"
+                )
+
+    # Bar plot Key signature vs. Spotify popularity
+    fig3 = px.bar(sp, x="key", y="sp_popularity", color='r_score', orientation='v',
+                hover_data=["r_title", "r_score"],
+                height=400,
+                title='Song popularity per key signature',
+                labels={
+                        "sp_popularity": "Spotify popularity score (0-100)",
+                        "r_score": "Reddit upvotes",
+                        "key": "Key signature"
+                    })
+
+    # Most underground vs. mainstream tracks
+    fig5 = px.scatter(sp, x='sp_artist_popularity',
+                y='sp_popularity',
+                color='sp_follower_count',
+                hover_name="r_title",
+                hover_data=['sp_genres'],
+                title='Most underground (lower left) vs. mainstream tracks (upper right)',
+                labels={
+                    "r_title": "Track",
+                    "sp_genres": "Genres",
+                    "sp_popularity": "Spotify song popularity (0-100)",
+                    "sp_follower_count": "Spotify followers",
+                    "sp_artist_popularity": "Spotify artist popularity (0-100)"
+                })
+
+    return [fig1, fig6, fig2, fig3, fig5]
+
+def load_figures(date):
+    """
+    Inputs a date string and returns the Dashboard figures for that day,
+    built once per snapshot and shared by all sessions.
+    """
+    stats = load_daily_stats(date)
+
+    return load_cached(('figures', date), existing_snapshot_path('spotify_top_100_songs', date),
+                       lambda path: build_figures(load_top_100(date), stats), date)
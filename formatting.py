@@ -0,0 +1,79 @@
+import logging
+import numpy as np
+import pandas as pd
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+MAGNITUDE_SUFFIXES = np.array(['', 'K', 'M', 'B', 'T'])
+# Parts of an ISO 8601 duration from the YouTube API, e.g. 'PT1H2M3S' or 'P1DT2H'
+ISO_DURATION = r'^P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$'
+
+###---Format whole columns---###
+
+def human_format(values):
+    """
+    Inputs a Series of numbers (or number strings) and returns a Series of human readable
+    numbers rounded to 3 significant digits, ex. 1256 to 1.26K. Missing values stay None.
+    """
+    numbers = pd.to_numeric(values, errors='coerce').astype(float)
+    valid = numbers.notna().to_numpy()
+    numbers = numbers.fillna(0).to_numpy()
+
+    # Round to 3 significant digits, then divide by 1000 per magnitude (up to trillions)
+    exponent = np.floor(np.log10(np.abs(np.where(numbers == 0, 1, numbers))))
+    factor = 10.0 ** (exponent - 2)
+    rounded = np.round(numbers / factor) * factor
+    magnitude = np.clip(np.floor(np.log10(np.abs(np.where(rounded == 0, 1, rounded))) / 3), 0, 4).astype(int)
+    scaled = rounded / 1000.0 ** magnitude
+
+    formatted = pd.Series(np.char.mod('%f', scaled), index=values.index).str.rstrip('0').str.rstrip('.')
+
+    return (formatted + MAGNITUDE_SUFFIXES[magnitude]).where(valid, None)
+
+def format_int(values, missing='-'):
+    """
+    Inputs a Series of numbers (e.g. floats from columns with missing values) and returns them as
+    integers, with 'missing' where there is no number.
+    """
+    numbers = pd.to_numeric(values, errors='coerce')
+
+    return numbers.round().astype('Int64').astype(object).where(numbers.notna(), missing)
+
+def format_ms(milliseconds):
+    """
+    Inputs a Series of durations in milliseconds and returns a Series of strings in format MM:SS.
+    """
+    milliseconds = pd.to_numeric(milliseconds, errors='coerce')
+    seconds = (milliseconds // 1000 % 60).astype('Int64').astype(str).str.zfill(2)
+    minutes = (milliseconds // 60000 % 60).astype('Int64').astype(str).str.zfill(2)
+
+    return (minutes + ':' + seconds).where(milliseconds.notna(), None)
+
+def format_yt_duration(time_strings):
+    """
+    Inputs a Series of ISO 8601 durations from the YouTube API (ex. 'PT1H2M3S') and returns a Series
+    of strings in format MM:SS, or HH:MM:SS for videos of an hour or more.
+    """
+    parts = time_strings.astype(str).str.extract(ISO_DURATION).astype(float)
+    valid = parts.notna().any(axis=1) & time_strings.notna()
+    parts = parts.fillna(0).astype(int)
+    hours = parts['days'] * 24 + parts['hours']
+    minutes_seconds = parts['minutes'].astype(str).str.zfill(2) + ':' + parts['seconds'].astype(str).str.zfill(2)
+    formatted = minutes_seconds.where(hours == 0, hours.astype(str).str.zfill(2) + ':' + minutes_seconds)
+
+    return formatted.where(valid, None)
+
+def format_yt_date(datetime_strings):
+    """
+    Inputs a Series of publish dates from the YouTube API (format YYYY-MM-DDTHH:MM:SSZ)
+    and returns a Series of date strings in format YYYY-MM-DD.
+    """
+    return datetime_strings.str.split('T').str[0]
+
+def format_explicit(values):
+    """
+    Inputs a Series of Spotify 'explicit' flags (booleans, or 1.0/0.0 after missing values)
+    and returns them as 'True'/'False' strings.
+    """
+    return values.astype(str).replace({'1.0': 'True', '0.0': 'False'})
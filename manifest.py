@@ -0,0 +1,126 @@
+import os
+import re
+import csv
+import json
+import hashlib
+import logging
+import threading
+from snapshots import DATA_DIR, snapshot_path, load_cached
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+MANIFEST_PATH = os.path.join(DATA_DIR, 'manifest.json')
+# Pipeline stages may save snapshots from several threads (e.g. one per subreddit)
+_manifest_lock = threading.Lock()
+
+# Families the web app needs for a day to count as complete
+APP_FAMILIES = ['reddit_top_150_songs', 'spotify_song_data', 'spotify_top_100_songs',
+                'spotify_extremes', 'chart_reddit', 'chart_spotify', 'chart_youtube']
+
+###---Describe snapshot files---###
+
+def file_entry(path):
+    """
+    Inputs the path of a snapshot CSV and returns a dictionary with its
+    row count, size in bytes and SHA-256 content hash.
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = sum(1 for _ in csv.reader(f)) - 1 # exclude header
+
+    return {'rows': max(rows, 0),
+            'bytes': len(content),
+            'sha256': hashlib.sha256(content).hexdigest()}
+
+def _latest_complete(dates, required=APP_FAMILIES):
+    """
+    Inputs the manifest's dates dictionary and returns the latest date that
+    has every required family, or None.
+    """
+    complete = [date for date, families in dates.items() if all(family in families for family in required)]
+
+    return max(complete) if complete else None
+
+###---Write the manifest---###
+
+def write_manifest(manifest):
+    """
+    Inputs a manifest dictionary, refreshes its 'latest_complete' date and
+    writes it to 'data/manifest.json' atomically.
+    """
+    manifest['dates'] = dict(sorted(manifest['dates'].items()))
+    manifest['latest_complete'] = _latest_complete(manifest['dates'])
+
+    temp_path = MANIFEST_PATH + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(temp_path, MANIFEST_PATH)
+
+def build_manifest():
+    """
+    Scans every snapshot CSV in the 'data' directory once and writes a new manifest.
+    Returns the manifest dictionary.
+    """
+    pattern = re.compile(r'^(.+)_(\d{4}-\d{2}-\d{2})\.csv$')
+    manifest = {'dates': {}}
+
+    for filename in sorted(os.listdir(DATA_DIR)):
+        match = pattern.match(filename)
+        if match:
+            family, date = match.groups()
+            manifest['dates'].setdefault(date, {})[family] = file_entry(os.path.join(DATA_DIR, filename))
+
+    write_manifest(manifest)
+    logging.info("\n---Manifest written: %s dates---\n" % (len(manifest['dates'])))
+    return manifest
+
+def record_snapshot(family, date):
+    """
+    Inputs an artifact family and a date string and adds (or refreshes) the
+    entry of that day's CSV file in the manifest.
+    """
+    entry = file_entry(snapshot_path(family, date))
+    with _manifest_lock:
+        manifest = _parse_manifest(MANIFEST_PATH) if os.path.exists(MANIFEST_PATH) else {'dates': {}}
+        manifest['dates'].setdefault(date, {})[family] = entry
+        write_manifest(manifest)
+
+###---Read the manifest---###
+
+def _parse_manifest(path):
+    with open(path) as f:
+        return json.load(f)
+
+def read_manifest():
+    """
+    Returns the manifest dictionary, read once per process and again only
+    when the pipeline rewrites the file. The dictionary is shared, don't modify it.
+    """
+    return load_cached(('manifest',), MANIFEST_PATH, _parse_manifest)
+
+def latest_complete_date():
+    """
+    Returns the latest date string for which every family the app needs exists.
+    """
+    return read_manifest()['latest_complete']
+
+def snapshot_dates(required=APP_FAMILIES):
+    """
+    Returns a sorted list of date strings that have every required family.
+    """
+    return [date for date, families in read_manifest()['dates'].items()
+            if all(family in families for family in required)]
+
+def missing_families(date, required=APP_FAMILIES):
+    """
+    Inputs a date string and returns the list of required families that have
+    no snapshot for that day (all of them if the date is unknown).
+    """
+    families = read_manifest()['dates'].get(date, {})
+
+    return [family for family in required if family not in families]
+
+if __name__ == '__main__':
+    build_manifest()
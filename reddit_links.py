@@ -0,0 +1,128 @@
+import re
+import sys
+import ast
+import json
+import logging
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+import pandas as pd
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+LINK_COLUMNS = ['link_source', 'sp_link', 'yt_link', 'yt_video_id', 'sc_link', 'sc_embed_link', 'bc_embed_link']
+
+SRC = re.compile('src="(\S+)"') # link of the embedded player
+YOUTUBE_SUFFIX = re.compile('\?(?:feature|start|list)\S*') # embed suffixes (feature, start time, playlist)
+VIDEO_ID_PREFIX = re.compile('\S+v=')
+
+###---Raw media data---###
+
+def media_to_json(media):
+    """
+    Inputs a Series of 'post.media' dictionaries and returns them as JSON strings, to be saved in CSV files.
+    """
+    return media.map(lambda data: json.dumps(data) if isinstance(data, dict) else data)
+
+def read_media(value):
+    """
+    Inputs raw media data as saved in a CSV file and returns the dictionary. Reads JSON
+    and the Python dict strings of data archived before media was saved as JSON.
+    """
+    if not isinstance(value, str):
+        return value
+    try:
+        return json.loads(value)
+    except ValueError:
+        return ast.literal_eval(value)
+
+def oembed_frame(media):
+    """
+    Inputs a Series of 'post.media' dictionaries (or strings as saved in CSV files) and
+    returns a DataFrame with the provider URL, direct URL and player link of each post.
+    """
+    oembed = [data['oembed'] if isinstance(data, dict) and isinstance(data.get('oembed'), dict) else {}
+              for data in map(read_media, media)]
+    html = pd.Series([data.get('html') for data in oembed], index=media.index, dtype=object)
+
+    return pd.DataFrame({'provider_url': [data.get('provider_url') for data in oembed],
+                         'url': [data.get('url') for data in oembed],
+                         'src': html.str.extract(SRC, expand=False)}, index=media.index)
+
+def embedded_param(src, param):
+    """
+    Inputs a Series of embedly player links and returns the decoded value of a query parameter
+    ('src' is the provider's own player, 'url' the page the post links to).
+    """
+    return src.map(lambda link: parse_qs(urlsplit(link).query).get(param, [None])[0] if isinstance(link, str) else None)
+
+###---Link extractors by provider---###
+
+def spotify_links(oembed):
+    """
+    Inputs the oembed DataFrame of posts with Spotify media and returns their Spotify links.
+    """
+    player = embedded_param(oembed['src'], 'src')
+
+    return pd.DataFrame({'sp_link': player.str.split('?').str[0].str.replace('embed/', '', regex=False)})
+
+def youtube_links(oembed):
+    """
+    Inputs the oembed DataFrame of posts with YouTube media and returns their YouTube links and video IDs.
+    """
+    # Embedded YouTube video links come with the direct link, direct video links only with the player link
+    watch_links = oembed['src'].str.replace(YOUTUBE_SUFFIX, '', regex=True).str.replace('/embed/', '/watch?v=', regex=False)
+    direct_links = oembed['url'].where(oembed['url'].notna(), watch_links)
+
+    return pd.DataFrame({'yt_link': direct_links,
+                         'yt_video_id': direct_links.str.replace(VIDEO_ID_PREFIX, '', regex=True)})
+
+def soundcloud_links(oembed):
+    """
+    Inputs the oembed DataFrame of posts with SoundCloud media and returns their SoundCloud direct and embed links.
+    """
+    return pd.DataFrame({'sc_link': embedded_param(oembed['src'], 'url').str.split('?').str[0],
+                         'sc_embed_link': embedded_param(oembed['src'], 'src')})
+
+def bandcamp_links(oembed):
+    """
+    Inputs the oembed DataFrame of posts with Bandcamp media and returns their Bandcamp embed links.
+    """
+    return pd.DataFrame({'bc_embed_link': embedded_param(oembed['src'], 'src')})
+
+# Provider URL in the oembed data: (link source, extractor)
+PROVIDERS = {'https://spotify.com': ('spotify', spotify_links),
+             'https://www.youtube.com/': ('youtube', youtube_links),
+             'https://soundcloud.com': ('soundcloud', soundcloud_links),
+             'http://bandcamp.com': ('bandcamp', bandcamp_links)}
+
+def extract_media_links(media):
+    """
+    Inputs a Series of 'post.media' dictionaries (or strings as saved in CSV files) and returns
+    a DataFrame with the same index, the link source and the media links of each post.
+    Link source is 'other' for unsupported providers and empty if no link could be extracted.
+    """
+    oembed = oembed_frame(media)
+    links = pd.DataFrame(index=media.index, columns=LINK_COLUMNS, dtype=object)
+    links['link_source'] = np.where(oembed['provider_url'].isna(), None, 'other')
+
+    for provider_url, (source, extract) in PROVIDERS.items():
+        rows = oembed['provider_url'] == provider_url
+        if not rows.any():
+            continue
+        provider_links = extract(oembed[rows])
+        links.loc[rows, provider_links.columns] = provider_links
+        links.loc[rows, 'link_source'] = provider_links.iloc[:, 0].notna().map({True: source, False: None})
+
+    return links
+
+if __name__ == '__main__':
+    # Usage: python reddit_links.py YYYY-MM-DD [YYYY-MM-DD ...]
+    # Re-extracts the links of archived top 150 songs from their raw media data and compares them to the saved links
+    from snapshots import read_snapshot
+    for date in sys.argv[1:]:
+        top_songs = read_snapshot('reddit_top_150_songs', date)
+        links = extract_media_links(top_songs['r_media_data'])
+        for column in ['link_source', 'sp_link', 'yt_link', 'yt_video_id', 'sc_link']:
+            same = (links[column].fillna('') == top_songs[column].fillna('')).sum()
+            print('%s  %-12s %s of %s links match' % (date, column, same, len(top_songs)))
@@ -0,0 +1,119 @@
+import os
+import json
+import datetime
+import itertools
+import logging
+import pandas as pd
+from snapshots import DATA_DIR
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+# Only posts with media from these sources are kept
+MEDIA_TYPES = ('youtube.com', 'open.spotify.com')
+POST_COLUMNS = ['r_post_id', 'r_title', 'r_media_title', 'r_post_date', 'r_upvote_ratio', 'r_score', 'r_media_data']
+
+# Subreddits to scrape and the number of song posts to collect from each,
+# e.g. REDDIT_SUBREDDITS="music:150,listentothis:150,indieheads:100"
+DEFAULT_SUBREDDITS = 'music:150,listentothis:150'
+
+# Posts seen on earlier days with their parsed song data and latest score
+STORE_PATH = os.path.join(DATA_DIR, 'reddit_post_store.json')
+# Posts not seen in the listings for this many days are dropped from the store
+MAX_POST_AGE_DAYS = 7
+
+###---Configuration---###
+
+def parse_subreddits(config):
+    """
+    Inputs a string of comma-separated 'subreddit:quota' pairs and returns
+    a list of (subreddit name, quota) tuples. The quota defaults to 150.
+    """
+    subreddits = []
+    for entry in config.split(','):
+        name, _, quota = entry.strip().partition(':')
+        if name:
+            subreddits.append((name.lower(), int(quota) if quota else 150))
+
+    return subreddits
+
+SUBREDDITS = parse_subreddits(os.environ.get('REDDIT_SUBREDDITS', DEFAULT_SUBREDDITS))
+
+###---Stream song posts---###
+
+def is_song_post(post):
+    """
+    Inputs a Reddit post and returns True if it has media from YouTube or Spotify and isn't NSFW.
+    """
+    return post.media is not None and post.over_18 == False and post.media['type'] in MEDIA_TYPES
+
+def post_record(post):
+    """
+    Inputs a Reddit post and returns a dictionary with the post data kept in the raw data.
+    """
+    return {'r_post_id': post.id,
+            'r_title': post.title,
+            'r_media_title': post.media['oembed']['title'],
+            'r_post_date': datetime.datetime.utcfromtimestamp(post.created_utc).date(), # keep only YYYY-MM-DD
+            'r_upvote_ratio': post.upvote_ratio,
+            'r_score': post.score,
+            'r_media_data': post.media} # raw media data
+
+def stream_song_posts(listing, quota=150):
+    """
+    Inputs an iterable of Reddit posts (e.g. 'subreddit.hot()') and a number of posts and
+    yields the records of the first song posts. Stops pulling from the listing once the quota
+    is met, so no further pages are requested from the Reddit API.
+    """
+    return itertools.islice(map(post_record, filter(is_song_post, listing)), quota)
+
+def posts_to_frame(records):
+    """
+    Inputs an iterable of post records and returns them as a DataFrame, built once.
+    """
+    return pd.DataFrame.from_records(list(records), columns=POST_COLUMNS)
+
+###---Known posts---###
+
+def load_post_store(path=STORE_PATH):
+    """
+    Returns the store dictionary of post ID -> {'parsed': [values], 'r_score', 'r_upvote_ratio', 'last_seen'}.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_post_store(store, path=STORE_PATH, max_age_days=MAX_POST_AGE_DAYS):
+    """
+    Inputs the store dictionary and saves it without the posts that haven't been seen for 'max_age_days'.
+    """
+    oldest = str(datetime.date.today() - datetime.timedelta(days=max_age_days))
+    for post_id in [post_id for post_id, post in store.items() if post['last_seen'] < oldest]:
+        del store[post_id]
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(store, f, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+def known_posts(df, store, columns):
+    """
+    Inputs a DataFrame of raw post data, the store dictionary and the list of parsed columns and
+    returns the rows of posts already in the store, expanded with their stored parsed columns.
+    Scores and upvote ratios are the ones just scraped.
+    """
+    df = df[df['r_post_id'].isin(store)].reset_index(drop=True)
+    parsed = pd.DataFrame([store[post_id]['parsed'] for post_id in df['r_post_id']], columns=columns, dtype=object)
+
+    return pd.concat([df, parsed], axis=1)
+
+def remember_posts(store, df, columns):
+    """
+    Inputs the store dictionary, a DataFrame of post data and the list of parsed columns
+    and adds or updates the posts' parsed columns, score, upvote ratio and date last seen.
+    """
+    today = str(datetime.date.today())
+    values = df[columns].astype(object).where(df[columns].notna(), None).values.tolist()
+    for post_id, parsed, score, upvote_ratio in zip(df['r_post_id'], values, df['r_score'], df['r_upvote_ratio']):
+        store[post_id] = {'parsed': parsed, 'r_score': int(score), 'r_upvote_ratio': float(upvote_ratio), 'last_seen': today}
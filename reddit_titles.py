@@ -0,0 +1,160 @@
+import os
+import re
+import json
+import datetime
+import logging
+import numpy as np
+import pandas as pd
+import emoji
+from youtube_title_parse import get_artist_title
+from snapshots import DATA_DIR
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+TITLE_COLUMNS = ['r_post_artist', 'r_post_song', 'r_media_artist', 'r_media_song', 'r_genres']
+
+# Artist/song parsed from each raw title in earlier runs - hot posts stay up for several days
+MEMO_PATH = os.path.join(DATA_DIR, 'title_memo.json')
+# Bump whenever 'clean_title' or 'parse_artist_song' changes, the memo is discarded on a new version
+PARSER_VERSION = 1
+# Titles kept in the memo, the ones seen least recently are dropped first
+MAX_MEMO_TITLES = 20000
+
+# Patterns compiled once, in the order they are applied
+UNTIL_BRACKET = re.compile('^.*?(?=\s\[|\(|\{)') # title up to the first bracket/parentheses
+QUOTES = re.compile("'")
+GENRE_BRACKETS = re.compile('\[(.*?)\]') # words between brackets
+GENRE_REPLACEMENTS = [(re.compile('r \& b'), 'r&b'),
+                      (re.compile('hip\-hop'), 'hip hop'),
+                      (re.compile('\/|\||\ & '), ', '), # comma separator
+                      (re.compile(' ,'), ','), # no spaces before commas
+                      (re.compile('  |   '), ' ')] # no extra spaces
+
+###---Parse a single title---###
+
+def clean_title(title):
+    """
+    Inputs Reddit post title string and outputs the
+    string up to the first bracket/parentheses.
+    """
+    try:
+        title_no_emojis = emoji.replace_emoji(title)
+        title_until_bracket = UNTIL_BRACKET.findall(title_no_emojis)
+        title_cleaned = QUOTES.sub('', title_until_bracket[0]).lstrip()
+    except:
+        title_cleaned = title
+
+    return title_cleaned
+
+def get_reddit_genres(string):
+    """
+    Inputs Reddit post title string and outputs the genres in
+    its brackets as a lowercase, comma-separated string.
+    """
+    genres = ', '.join(GENRE_BRACKETS.findall(string)).lower()
+    for pattern, replacement in GENRE_REPLACEMENTS:
+        genres = pattern.sub(replacement, genres)
+
+    return genres
+
+def parse_artist_song(title):
+    """
+    Inputs a Reddit post or media title and returns an (artist, song) tuple,
+    or (None, None) if the cleaned title can't be parsed.
+    """
+    title = clean_title(title)
+    if type(title) is str:
+        try:
+            artist_song = get_artist_title(title)
+            if artist_song:
+                artist, song = artist_song
+                return artist, song
+        except:
+            pass
+
+    return None, None
+
+###---Memo of parsed titles---###
+
+def load_title_memo(path=MEMO_PATH):
+    """
+    Returns the memo dictionary of raw title -> [artist, song, date last seen],
+    empty if there is none yet or it was written by another parser version.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        memo = json.load(f)
+
+    return memo['titles'] if memo.get('version') == PARSER_VERSION else {}
+
+def save_title_memo(memo, path=MEMO_PATH, max_titles=MAX_MEMO_TITLES):
+    """
+    Inputs the memo dictionary and saves it, keeping only the 'max_titles' titles seen most recently.
+    """
+    if len(memo) > max_titles:
+        for title in sorted(memo, key=lambda title: memo[title][2])[:len(memo) - max_titles]:
+            del memo[title]
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump({'version': PARSER_VERSION, 'titles': memo}, f, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+###---Parse title columns---###
+
+def parse_distinct(values, parse, memo=None):
+    """
+    Inputs an array of strings and a parsing function that returns an (artist, song) tuple and
+    returns an artist array and a song array. Each distinct string is parsed once, missing values
+    give None. If a memo dictionary is given, titles in it aren't parsed again and new ones are added.
+    """
+    codes, uniques = pd.factorize(values)
+    today = str(datetime.date.today())
+    parsed = []
+    hits = 0
+
+    for value in uniques:
+        if memo is not None and type(value) is str:
+            if value in memo:
+                hits += 1
+            else:
+                memo[value] = list(parse(value)) + [None]
+            memo[value][2] = today
+            parsed.append(memo[value])
+        else:
+            parsed.append(parse(value))
+
+    if memo is not None:
+        logging.info("\n---Title memo: %s of %s distinct titles already parsed (%.0f%% hit rate)---\n"
+                     % (hits, len(uniques), 100 * hits / max(len(uniques), 1)))
+
+    # Code -1 (missing value) picks the None appended at the end
+    return [np.array([result[i] for result in parsed] + [None], dtype=object)[codes] for i in range(2)]
+
+def genre_column(titles):
+    """
+    Inputs a Series of Reddit post titles and returns a Series of their genres (see 'get_reddit_genres').
+    """
+    genres = titles.astype(object).str.findall(GENRE_BRACKETS).str.join(', ').str.lower()
+    for pattern, replacement in GENRE_REPLACEMENTS:
+        genres = genres.str.replace(pattern, replacement, regex=True)
+
+    return genres
+
+def parse_titles(df, memo=None):
+    """
+    Inputs DataFrame of raw data from Reddit and returns a DataFrame with the same index and
+    columns for the Reddit post title's artist name and song title, post media title's
+    artist name and song title and genres. Post and media titles are parsed together,
+    so a string appearing in both (or on several rows) is only parsed once.
+    Titles in the memo dictionary (see 'load_title_memo') aren't parsed at all.
+    """
+    titles = np.concatenate([df['r_title'].to_numpy(dtype=object), df['r_media_title'].to_numpy(dtype=object)])
+    artists, songs = parse_distinct(titles, parse_artist_song, memo)
+    n = len(df)
+
+    return pd.DataFrame({'r_post_artist': artists[:n], 'r_post_song': songs[:n],
+                         'r_media_artist': artists[n:], 'r_media_song': songs[n:],
+                         'r_genres': genre_column(df['r_title']).to_numpy()}, index=df.index)
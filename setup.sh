@@ -5,4 +5,6 @@ echo "\
 headless = true\n\
 enableCORS=false\n\
 port = $PORT\n\
+[global]\n\
+minCachedMessageSize = 1000\n\
 " > ~/.streamlit/config.toml
\ No newline at end of file
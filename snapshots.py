@@ -0,0 +1,166 @@
+import os
+import threading
+from collections import OrderedDict
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+# Every file the pipeline reads and writes (snapshots, caches, memos) is kept here,
+# set DATA_DIR to run the pipeline on another folder (e.g. see bench_pipeline.py)
+DATA_DIR = os.environ.get('DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+
+# Parsed snapshots shared by every session in the process: date -> {key: (stamp, value)},
+# least recently viewed day first. Entries without a date (e.g. the manifest) are kept under None.
+_cache = OrderedDict()
+# Number of days kept in memory while users browse the archive
+MAX_CACHED_DAYS = 8
+_cache_lock = threading.Lock()
+
+###---Snapshot files---###
+
+def snapshot_path(family, date, extension='csv'):
+    """
+    Inputs an artifact family (e.g. 'chart_spotify'), a date string in format
+    YYYY-MM-DD and a file extension and returns the path of that day's file.
+    """
+    return os.path.join(DATA_DIR, '%s_%s.%s' % (family, date, extension))
+
+def existing_snapshot_path(family, date):
+    """
+    Inputs an artifact family and a date string and returns the path of the
+    Feather file for that day if it exists, otherwise the path of the CSV file.
+    """
+    feather_path = snapshot_path(family, date, 'feather')
+    if os.path.exists(feather_path):
+        return feather_path
+
+    return snapshot_path(family, date)
+
+def _file_stamp(path):
+    """
+    Inputs a file path and returns (mtime, size) which changes whenever
+    the file is rewritten by the pipeline.
+    """
+    stat = os.stat(path)
+
+    return stat.st_mtime_ns, stat.st_size
+
+def to_columnar(df):
+    """
+    Inputs a DataFrame parsed from a snapshot CSV and returns it ready to be
+    written as Feather: object columns mixing value types (e.g. numbers and text)
+    are stored as strings, single-type columns such as booleans with gaps keep their type.
+    """
+    df = df.copy()
+
+    for column in df.select_dtypes('object').columns:
+        values = df[column].dropna()
+        if values.map(type).nunique() > 1:
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+
+    return df
+
+###---Save snapshots---###
+
+def save_snapshot(df, family, date, index=False):
+    """
+    Inputs a DataFrame, an artifact family and a date string and saves the
+    snapshot as a CSV file plus a typed Feather copy, and records it in the manifest.
+    The Feather copy is written from the parsed CSV so both formats load into
+    identical DataFrames.
+    """
+    import pandas as pd
+
+    csv_path = snapshot_path(family, date)
+    df.to_csv(csv_path, index=index)
+    to_columnar(pd.read_csv(csv_path)).to_feather(snapshot_path(family, date, 'feather'))
+
+    # Imported here as manifest.py builds on this module
+    from manifest import record_snapshot
+    record_snapshot(family, date)
+
+    return csv_path
+
+###---Load snapshots---###
+
+def read_snapshot(family, date):
+    """
+    Inputs an artifact family and a date string and returns a fresh (writable)
+    DataFrame of that day's snapshot, read from Feather if the day has been
+    converted and from CSV otherwise.
+    """
+    return read_snapshot_file(existing_snapshot_path(family, date))
+
+def read_snapshot_file(path):
+    """
+    Inputs the path of a snapshot file (Feather or CSV) and returns its DataFrame.
+    """
+    # Imported on first read, the web app needs the manifest and cached pages before any DataFrame
+    import numpy as np
+    import pandas as pd
+
+    if path.endswith('.feather'):
+        df = pd.read_feather(path)
+        # Feather reads missing strings back as None, CSV as NaN
+        text_columns = df.select_dtypes('object').columns
+        df[text_columns] = df[text_columns].fillna(np.nan)
+        return df
+
+    return pd.read_csv(path)
+
+def _evict_old_days():
+    """
+    Drops the least recently viewed days until at most MAX_CACHED_DAYS are cached.
+    """
+    while len(_cache) - (None in _cache) > MAX_CACHED_DAYS:
+        oldest = next(date for date in _cache if date is not None)
+        del _cache[oldest]
+        logging.info("\n---Evicted %s from the snapshot cache---\n" % (oldest))
+
+def load_cached(key, path, parse, date=None):
+    """
+    Inputs a cache key, a file path, a function that parses the file and the date the
+    file belongs to, and returns the parsed value, shared by all sessions in the process.
+    The file is parsed again only when it is replaced (new path, mtime or size).
+    Only the MAX_CACHED_DAYS most recently used dates are kept.
+    The file is parsed outside the lock, so 'parse' may itself load other cached files.
+    """
+    stamp = (path,) + _file_stamp(path)
+
+    with _cache_lock:
+        _cache.setdefault(date, {})
+        _cache.move_to_end(date)
+        cached = _cache[date].get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+    # Two sessions may parse the same new file at once, the last one parsed is kept
+    value = parse(path)
+
+    with _cache_lock:
+        _cache.setdefault(date, {})[key] = (stamp, value)
+        _cache.move_to_end(date)
+        logging.info("\n---Loaded '%s' into the snapshot cache---\n" % (os.path.basename(path)))
+        _evict_old_days()
+
+    return value
+
+def load_snapshot(family, date):
+    """
+    Inputs an artifact family and a date string and returns that day's DataFrame.
+    Each file is parsed once per process and re-parsed only when it is replaced
+    (new mtime or size, or a Feather copy appears). The returned frame is a shallow
+    copy of the cached one shared by all sessions: index and columns can be reassigned,
+    but its values must not be modified in place (use 'read_snapshot' for a writable frame).
+    """
+    frame = load_cached((family, date), existing_snapshot_path(family, date), read_snapshot_file, date)
+
+    return frame.copy(deep=False)
+
+def clear_cache():
+    """
+    Drops all cached snapshots, e.g. after a backfill rewrote old files in place.
+    """
+    with _cache_lock:
+        _cache.clear()
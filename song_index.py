@@ -0,0 +1,131 @@
+import os
+import re
+import csv
+import json
+import logging
+from unidecode import unidecode
+from snapshots import DATA_DIR, snapshot_path, load_cached
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+INDEX_PATH = os.path.join(DATA_DIR, 'song_index.json')
+
+# Per source: (song data family, artist columns, song columns, other searchable columns)
+# The first non-empty artist/song column is shown in search results
+SOURCES = {'spotify': ('spotify_song_data', ['sp_artist', 'r_post_artist'], ['sp_song', 'r_post_song'],
+                       ['r_genres', 'sp_genres']),
+           'youtube': ('youtube_song_data', ['r_media_artist', 'r_post_artist', 'channel_title'],
+                       ['r_media_song', 'r_post_song', 'video_title'], ['r_genres', 'video_title'])}
+
+###---Tokens---###
+
+def tokenize(string):
+    """
+    Inputs a string and returns its list of normalized search tokens
+    (ASCII, lowercase, split on anything that isn't a letter or digit).
+    """
+    return re.findall('[a-z0-9]+', unidecode(str(string)).lower())
+
+def _first_value(record, columns):
+    """
+    Inputs a CSV record and a list of columns and returns the first non-empty value.
+    """
+    for column in columns:
+        value = record.get(column)
+        if value and value != 'nan':
+            return value
+
+    return None
+
+###---Build the index---###
+
+def _read_index(path=INDEX_PATH):
+    if not os.path.exists(path):
+        return {'indexed': [], 'docs': [], 'postings': {}}
+    with open(path) as f:
+        return json.load(f)
+
+def _add_day(index, date, source):
+    """
+    Inputs the index dictionary, a date string and a source ('spotify' or 'youtube')
+    and adds one document per song in that day's song data. Rank is the song's position
+    in the day's data, which is sorted by Reddit upvotes.
+    """
+    family, artist_columns, song_columns, other_columns = SOURCES[source]
+
+    with open(snapshot_path(family, date), newline='', encoding='utf-8') as f:
+        for rank, record in enumerate(csv.DictReader(f), start=1):
+            artist = _first_value(record, artist_columns)
+            song = _first_value(record, song_columns)
+            if artist is None and song is None:
+                continue
+            doc_id = len(index['docs'])
+            index['docs'].append([date, source, rank, artist, song, record.get('r_genres') or None])
+            searchable = [artist, song] + [record.get(column) for column in other_columns]
+            for token in set(token for value in searchable if value for token in tokenize(value)):
+                index['postings'].setdefault(token, []).append(doc_id)
+
+    index['indexed'].append('%s/%s' % (date, source))
+
+def _write_index(index):
+    temp_path = INDEX_PATH + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.replace(temp_path, INDEX_PATH)
+
+def update_song_index(date, source):
+    """
+    Inputs a date string and a source ('spotify' or 'youtube') and adds that day's
+    songs to the search index, unless they are already indexed.
+    """
+    index = _read_index()
+    if '%s/%s' % (date, source) in index['indexed']:
+        return
+    _add_day(index, date, source)
+    _write_index(index)
+    logging.info("\n---Search index updated: %s songs on %s---\n" % (source, date))
+
+def build_song_index():
+    """
+    Builds the search index from scratch over every archived day of song data.
+    """
+    pattern = re.compile(r'^(spotify|youtube)_song_data_(\d{4}-\d{2}-\d{2})\.csv$')
+    days = sorted((match.group(2), match.group(1)) for match in map(pattern.match, os.listdir(DATA_DIR)) if match)
+    index = {'indexed': [], 'docs': [], 'postings': {}}
+
+    for date, source in days:
+        _add_day(index, date, source)
+
+    _write_index(index)
+    logging.info("\n---Search index built: %s days, %s songs---\n" % (len(days), len(index['docs'])))
+
+###---Search---###
+
+def search_songs(query, limit=200):
+    """
+    Inputs a search string and returns a list of (date, source, rank, artist, song, genres)
+    for songs matching every word, latest day first. The last word also matches as a prefix.
+    """
+    tokens = tokenize(query)
+    if not tokens or not os.path.exists(INDEX_PATH):
+        return []
+    index = load_cached(('song_index',), INDEX_PATH, _read_index)
+    postings = index['postings']
+
+    matches = None
+    for i, token in enumerate(tokens):
+        if i == len(tokens) - 1:
+            doc_ids = set(doc_id for key in postings if key.startswith(token) for doc_id in postings[key])
+        else:
+            doc_ids = set(postings.get(token, []))
+        matches = doc_ids if matches is None else matches & doc_ids
+        if not matches:
+            return []
+
+    docs = sorted((index['docs'][doc_id] for doc_id in matches), key=lambda doc: (doc[0], -doc[2]), reverse=True)
+
+    return [tuple(doc) for doc in docs[:limit]]
+
+if __name__ == '__main__':
+    build_song_index()
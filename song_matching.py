@@ -0,0 +1,44 @@
+import logging
+import numpy as np
+import pandas as pd
+from rapidfuzz import process, fuzz, utils
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+# Artist names and song titles are compared separately, regardless of word order
+SCORER = fuzz.token_sort_ratio
+PROCESSOR = utils.default_process
+
+###---Match scores---###
+
+def match_scores(artists, songs, references):
+    """
+    Inputs Series of candidate artist names and song titles (e.g. Spotify search results) and a list of
+    (artist names, song titles) Series parsed from the post each candidate was found for (e.g. post title
+    and post media title), aligned with the candidates. Returns a Series with each candidate's best score
+    (0-100) against any of the references: the mean of its artist score and song score. All comparisons
+    are made in one matrix computation on all CPU cores. Names and titles that are missing or empty once
+    processed (e.g. punctuation only, like the band '!!!') score 0, not 100 against another empty one.
+    """
+    if len(artists) == 0:
+        return pd.Series(dtype=float, index=artists.index)
+
+    def processed(values):
+        return np.array([PROCESSOR(value) for value in pd.Series(values).fillna('').astype(str)], dtype=object)
+
+    candidates = np.concatenate([processed(values) for _ in references for values in (artists, songs)])
+    parsed = np.concatenate([processed(values) for pair in references for values in pair])
+    matrix = process.cpdist(candidates, parsed, scorer=SCORER, workers=-1)
+    matrix[(candidates == '') | (parsed == '')] = 0
+    # references x (artist, song) x candidates
+    matrix = matrix.reshape(len(references), 2, len(artists))
+
+    return pd.Series(matrix.mean(axis=1).max(axis=0), index=artists.index, dtype=float)
+
+def best_matches(scores, posts):
+    """
+    Inputs a Series of match scores and a Series of the post each candidate was found for
+    and returns the index labels of the best scoring candidate of each post (the first one on a tie).
+    """
+    return scores.groupby(posts.to_numpy(), sort=False).idxmax()
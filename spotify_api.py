@@ -1,14 +1,17 @@
 import pandas as pd
 import datetime
 import re
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-import emoji
-from fuzzywuzzy import process
 import warnings
 from pandas.core.common import SettingWithCopyWarning
 import logging
-from user_credentials import S_CLIENT_ID, S_SECRET_KEY
+from snapshots import read_snapshot, save_snapshot
+from song_index import update_song_index
+from api_clients import spotify_client
+from spotify_lookup import AUDIO_FEATURES_BATCH, TRACKS_BATCH, ARTISTS_BATCH, chunks, search_artists, fetch_audio_features, fetch_tracks, fetch_artists, log_latency_histograms
+from spotify_cache import log_cache_stats
+from song_matching import match_scores
+from spotify_resolution import resolve_tracks, log_resolution_stats
+from formatting import human_format, format_ms, format_explicit
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -16,12 +19,11 @@ logging.basicConfig(level=logging.INFO)
 warnings.simplefilter(action="ignore", category=SettingWithCopyWarning)
 
 # Import data
-reddit_songs = pd.read_csv("data/reddit_top_150_songs_%s.csv" % (str(datetime.date.today())))
+reddit_songs = read_snapshot('reddit_top_150_songs', str(datetime.date.today()))
 logging.critical("\n---DataFrame created from import 'reddit_top_150_songs_%s.csv'---\n" % (str(datetime.date.today())))
 
-# Spotify API authentication
-auth_manager = SpotifyClientCredentials(S_CLIENT_ID, S_SECRET_KEY)
-sp = spotipy.Spotify(auth_manager=auth_manager)
+# Spotify API authentication (or recorded responses, see api_clients.py)
+sp = spotify_client()
 logging.critical("\n---Connected to Spotify API---\n")
 
 
@@ -52,83 +54,83 @@ def get_spotify_features(df):
     """
     feats_list = []
     not_found_list = []
-    
-    for i, row in df.iterrows():
-        query_post = str(df['r_post_song'][i]) + ' ' + str(df['r_post_artist'][i])
-        query_media = str(df['r_media_song'][i]) + ' ' + str(df['r_media_artist'][i])
-        queries = [query_post, query_media]
-        
-        for query in queries:
-            if query != 'nan nan':
-                search_result = sp.search(q=query, type='track')
-                
-                try: 
-                    if df['track_id'][i] != None:
-                        # Get track ID from Spotify links posted on Reddit
-                        track_id = df['track_id'][i]
-                    else:
-                        # Get the track ID of the song
-                        track_id = search_result['tracks']['items'][0]['id']
-
-                    # Get audio features via Spotify API
-                    features = sp.audio_features(tracks=track_id)
-                    # Add audio features to features dictionary
-                    feats_dict = features[0]
-
-                    # Get album features via Spotify API
-                    track_result = sp.track(track_id, market=None)
-                    # Add results to features dictionary
-                    feats_dict['sp_artwork_640px'] = track_result['album']['images'][0]['url'] 
-                    date = pd.to_datetime(track_result['album']['release_date']) 
-                    feats_dict['sp_release_date'] = date
-                    feats_dict['sp_release_year'] = int(date.year)
-                    feats_dict['sp_explicit'] = track_result['explicit'] 
-                    feats_dict['sp_popularity'] = track_result['popularity'] 
-                    feats_dict['sp_audio_preview'] = track_result['preview_url'] 
-
-                    # Add song and artist to dictionary (allows merge with input df)
-                    feats_dict['r_post_song'] = df['r_post_song'][i]
-                    feats_dict['r_post_artist'] = df['r_post_artist'][i]
-                    feats_dict['r_media_song'] = df['r_media_song'][i]
-                    feats_dict['r_media_artist'] = df['r_media_artist'][i]
-                    feats_dict['r_title'] = df['r_title'][i]
-                    feats_dict['r_media_title'] = df['r_media_title'][i]
-                    feats_dict['r_score'] = df['r_score'][i]
-                    feats_dict['sp_link'] = df['sp_link'][i]
-
-                    # Get Spotify song and artist name
-                    feats_dict['sp_song'] = track_result['name'] # song name
-                    feats_dict['sp_artist'] = track_result['artists'][0]['name'] # artist name
-
-                    # Save song's dictionary in list
-                    feats_list.append(feats_dict)
-
-                except: #IndexError
-                    # If the song was not found via the Spotify API search, save the song and artist to a list
-                    not_found_dict = {}
-                    not_found_dict['r_post_song'] = df['r_post_song'][i]
-                    not_found_dict['r_post_artist'] = df['r_post_artist'][i]
-                    not_found_list.append(not_found_dict)
-                    continue
-            
-            else:                
-                continue
+
+    # Resolution phase: get the track of each post from the cheapest source that finds a confident match,
+    # i.e. the Spotify link posted on Reddit, cached searches or new searches (see spotify_resolution.py)
+    resolved, stats = resolve_tracks(sp, df)
+    log_resolution_stats(stats)
+    attempts = list(resolved.items())
+
+    # Fetch phase: get audio and album features of all tracks found, in batches (see spotify_lookup.py)
+    track_ids = [track_id for _, track_id in attempts if track_id is not None]
+    audio_features = fetch_audio_features(sp, track_ids)
+    tracks = fetch_tracks(sp, track_ids)
+    unique_ids = list(set(track_ids))
+    lookups = len(chunks(unique_ids, AUDIO_FEATURES_BATCH)) + len(chunks(unique_ids, TRACKS_BATCH))
+    logging.info("\n---Spotify lookups: %s tracks in %s requests (instead of %s)---\n" % (len(unique_ids), lookups, 2 * len(track_ids)))
+
+    for i, track_id in attempts:
+        try:
+            # Add audio features to features dictionary
+            feats_dict = dict(audio_features[track_id])
+
+            # Add album features to features dictionary
+            track_result = tracks[track_id]
+            feats_dict['sp_artwork_640px'] = track_result['album']['images'][0]['url'] 
+            date = pd.to_datetime(track_result['album']['release_date']) 
+            feats_dict['sp_release_date'] = date
+            feats_dict['sp_release_year'] = int(date.year)
+            feats_dict['sp_explicit'] = track_result['explicit'] 
+            feats_dict['sp_popularity'] = track_result['popularity'] 
+            feats_dict['sp_audio_preview'] = track_result['preview_url'] 
+
+            # Add post ID (to merge with input df), song and artist to dictionary
+            feats_dict['r_post_id'] = df['r_post_id'][i]
+            feats_dict['r_post_song'] = df['r_post_song'][i]
+            feats_dict['r_post_artist'] = df['r_post_artist'][i]
+            feats_dict['r_media_song'] = df['r_media_song'][i]
+            feats_dict['r_media_artist'] = df['r_media_artist'][i]
+            feats_dict['r_title'] = df['r_title'][i]
+            feats_dict['r_media_title'] = df['r_media_title'][i]
+            feats_dict['r_score'] = df['r_score'][i]
+            feats_dict['sp_link'] = df['sp_link'][i]
+
+            # Get Spotify song and artist name
+            feats_dict['sp_song'] = track_result['name'] # song name
+            feats_dict['sp_artist'] = track_result['artists'][0]['name'] # artist name
+            feats_dict['sp_artist_id'] = track_result['artists'][0].get('id') # artist ID (for the artist data)
+
+            # Save song's dictionary in list
+            feats_list.append(feats_dict)
+
+        except: # not found (no search result, no audio features or album data)
+            # If the song was not found via the Spotify API search, save the song and artist to a list
+            not_found_dict = {}
+            not_found_dict['r_post_id'] = df['r_post_id'][i]
+            not_found_dict['r_post_song'] = df['r_post_song'][i]
+            not_found_dict['r_post_artist'] = df['r_post_artist'][i]
+            not_found_list.append(not_found_dict)
+            continue
             
     # Convert features list into DataFrames        
     features = pd.DataFrame(feats_list)    
     
     # Reindex columns so song, artist and track ID are first
-    features = features.reindex(columns=(['sp_song', 'sp_artist', 'r_title', 'r_media_title', 'r_post_song', 
-                                          'r_post_artist', 'r_media_song', 'r_media_artist', 'id', 'sp_link',
-                                          'r_score', 'danceability', 
+    features = features.reindex(columns=(['sp_song', 'sp_artist', 'r_post_id', 'r_title', 'r_media_title', 'r_post_song', 
+                                          'r_post_artist', 'r_media_song', 'r_media_artist', 'id', 'sp_artist_id', 'sp_link',
+                                          'r_score', 'match_score', 'danceability', 
                                           'energy', 'key', 'loudness', 'mode', 'speechiness', 'acousticness', 
                                           'instrumentalness', 'liveness', 'valence', 'tempo', 'type', 'uri', 
                                           'track_href', 'analysis_url', 'duration_ms', 'time_signature', 
                                           'sp_artwork_640px', 'sp_release_date', 'sp_release_year', 
                                           'sp_explicit', 'sp_popularity', 'sp_audio_preview']))
+    # Score how close each track is to the Reddit post (also the tracks of Spotify links posted on Reddit)
+    features['match_score'] = match_scores(features['sp_artist'], features['sp_song'],
+                                           [(features['r_post_artist'], features['r_post_song']),
+                                            (features['r_media_artist'], features['r_media_song'])])
     
     # Save to CSV to avoid extra API requests
-    features.to_csv("data/spotify_raw_data_%s.csv" % (str(datetime.date.today())), index=None)
+    save_snapshot(features, 'spotify_raw_data', str(datetime.date.today()))
     
     # Convert not found list into DataFrames        
     not_found = pd.DataFrame(not_found_list)
@@ -146,48 +148,11 @@ logging.info("\n---DataFrame created: list of songs not found on Spotify---\n")
 not_found_feats = not_found_feats.drop_duplicates().reset_index(drop=True)
 
 # Drop duplicate rows
-spotify_feats.drop_duplicates(inplace=True) # drop general duplicates
+spotify_feats.drop_duplicates('r_post_id', inplace=True) # one result per post
 spotify_feats.drop_duplicates(['sp_song', 'sp_artist'], inplace=True) # drop duplicate spotify search results
 
-# Get DataFrame of songs where there were 2 different results
-multiple_sp_results = spotify_feats[spotify_feats.duplicated('r_title', keep=False)]
-
-# Remove duplicates DataFrame from main DataFrame
-spotify_feats.drop(multiple_sp_results.index, inplace=True)
-
-def get_the_right_song(df):
-    """
-    Inputs a DataFrame with multiple songs found on Spotify and chooses the one closest
-    to the original Reddit post title or post media title.
-    """
-    df = pd.concat([df, pd.DataFrame([{'match_score': None}])], ignore_index=True)
-    
-    for i, row in df.iterrows():
-        spotify_string = str(df['sp_artist'][i]) + '' + str(df['sp_song'][i]) # spotify result
-        r_post_string = str(df['r_post_artist'][i]) + '' + str(df['r_post_song'][i]) # artist and song parsed from Reddit post title
-        r_media_string = str(df['r_media_artist'][i]) + '' + str(df['r_media_song'][i]) # artist and song parsed from Reddit post media title
-        
-        # Compare Reddit post and post media title with Spotify result
-        choices = [r_post_string, r_media_string]
-        match_score = process.extractOne(spotify_string, choices)
-        df['match_score'][i] = match_score[1]
-    
-    # Remove empty last row of DataFrame
-    df.drop(df.tail(1).index, inplace=True)
-    
-    return df
-
-# Get the best song match out of the duplicates
-logging.info("\n---Executing 'get_the_right_song'...---\n")
-match_scores = get_the_right_song(multiple_sp_results)
-logging.info("\n---Cleaned up DataFrame created: only best match kept from duplicates---\n")
-
-# Sort duplicates DataFrame by best song match and drop the other one
-best_spotify_match = match_scores.sort_values('match_score', ascending=False).drop_duplicates('r_title').sort_index()
-best_spotify_match.drop(columns=['match_score'], inplace=True)
-
-# Reapply the best matched songs to the main DataFrame
-spotify_feats_matched = pd.concat([spotify_feats, best_spotify_match])
+# Keep the best match of songs with several results (e.g. the same title posted on both subreddits)
+spotify_feats_matched = spotify_feats.sort_values('match_score', ascending=False, kind='stable').drop_duplicates('r_title')
 
 # Resort song order by Reddit upvotes
 spotify_feats_matched = spotify_feats_matched.sort_values('r_score', ascending=False)
@@ -197,107 +162,70 @@ spotify_feats_matched.reset_index(inplace=True, drop=True)
 
 ###---Merge with top songs DataFrame---###
 
-# Merge Spotify DataFrame with top songs DataFrame
-reddit_with_feats = reddit_songs.merge(spotify_feats_matched, on=['r_post_song', 'r_post_artist', 
-                                                                  'r_score', 'r_title', 'r_media_title', 
-                                                                  'r_media_song', 'r_media_artist'], 
-                                                                   how='outer')
+# Merge Spotify DataFrame with top songs DataFrame on the post ID (Reddit columns are taken from the top songs)
+spotify_columns = ['r_post_id'] + [column for column in spotify_feats_matched.columns if column not in reddit_songs.columns]
+reddit_with_feats = reddit_songs.merge(spotify_feats_matched[spotify_columns], on='r_post_id', how='left', validate='one_to_one')
 logging.info("\n---Merged Spotify and Reddit DataFrames---\n")
 
 
-###---Troubleshoot Spotify query---###
-
-def clean_spotify_query(string):
-    """
-    Inputs a string with 'artist name' + ' ' + 'song title' and returns
-    a cleaned string (remove special characters etc.)
-    """
-    remove_emojis = ''.join(char for char in string if char not in emoji.UNICODE_EMOJI['en']) # remove emojis
-    #to_ascii = unidecode(no_emojis) # replace non-ASCII characters with ASCII equivalent
-    remove_non_ascii = remove_emojis.encode("ascii", "ignore") # remove non-ASCII characters (encoding)
-    remove_non_ascii_2 = remove_non_ascii.decode() # remove non-ASCII characters (decoding)
-    dash_to_space = re.sub('-', ' ', remove_non_ascii_2) # replace dashes with space, ex. inside artist name
-    space_before_capitals = re.sub(r"(?<=\w)([A-Z])", r" \1", dash_to_space) # put space before capital letters, ex. HaHa = Ha Ha
-    until_feat = re.findall('^.*?(?=feat\.|feat|ft\.|ft|f\/|f\.|Feat\.|Ft\.)', space_before_capitals) # keep text up to 'feat', i.e. featured artists
-    
-    if until_feat == []:
-        return space_before_capitals # for titles without a featuring artist
-    else:
-        return until_feat[0] # for titles with a featuring artist
-
-def remove_first_word(string):
-    """
-    Returns a string with the first word removed.
-    """
-    words = string.split()
-    no_first_word = ' '.join(words[1:])
-    
-    return no_first_word
-
-def separate_multiple_artists(string):
-    """
-    Inputs a string of a song artist. If there are multiple artist names,
-    it will return a list of artist names. 
-    """
-    # Check for multiple artists by finding 'feat.', '&', ' X ', etc. in artist name
-    artists = re.findall('&|\sx\s|\sX\s|\+|,|\sand\s|feat\.|feat|ft\.|ft|f\/|f\.|Feat\.|Ft\.', string)
-    
-    if artists != []: 
-        return re.split('&|\sx\s|\sX\s|\+|,|\sand\s|feat\.|feat|ft\.|ft|f\/|f\.|Feat\.|Ft\.', string)
-    
 def get_spotify_artist_data(df):
     """
     Inputs a DataFrame with artist and song titles and returns a DataFrame
     of each artist's genres as listed on Spotify. If the song is not found
-    via the Spotify API, it will return a blank row. 
+    via the Spotify API, it will return a blank row. Each artist is looked up
+    once and the result used for all of the artist's songs.
     """
     artist_list = []
     not_found = []
-    
-    for i, row in df.iterrows():
-        if df['sp_artist'][i] == None:
-            query = str(df['r_artist_post'][i])
+
+    # Look up each artist once: by the artist ID of the Spotify track found, in batches, or by name
+    # if the track data has no artist ID. Songs not found on Spotify have no artist to look up.
+    found = df['sp_artist'].notna()
+    artist_ids = df['sp_artist_id'].where(found)
+    names = df['sp_artist'].where(found & artist_ids.isna())
+    unique_ids, unique_names = list(artist_ids.dropna().unique()), list(names.dropna().unique())
+    by_id = fetch_artists(sp, unique_ids)
+    by_name = search_artists(sp, unique_names)
+    lookups = len(chunks(unique_ids, ARTISTS_BATCH)) + len(unique_names)
+    logging.info("\n---Spotify artist lookups: %s artists in up to %s requests (instead of %s)---\n"
+                 % (len(unique_ids) + len(unique_names), lookups, len(df)))
+
+    for i in df.index:
+        if pd.notna(artist_ids[i]):
+            query, artist = artist_ids[i], by_id.get(artist_ids[i])
+        elif pd.notna(names[i]):
+            query, artist = names[i], by_name.get(str(names[i]))
         else:
-            query = df['sp_artist'][i]
-        
-        search_result = sp.search(q=query, type='artist')
+            query, artist = df['r_post_artist'][i], None
 
         try:
             artist_dict = {}
             # Extract genre from search result
-            genres = search_result['artists']['items'][0]['genres']
+            genres = artist['genres']
             # Format result into comma-separated string
             genres_no_brackets = re.sub('\[', '', str(genres))
             genres_no_brackets2 = re.sub('\]', '', genres_no_brackets)
             # Add artist genres to dictionary
             artist_dict['sp_genres'] = genres_no_brackets2
             # Add artist (not track) popularity to dictionary
-            artist_dict['sp_artist_popularity'] = search_result['artists']['items'][0]['popularity']
+            artist_dict['sp_artist_popularity'] = artist['popularity']
             # Add Spotify follower count (does not incl. monthly listeners) to dictionary
-            artist_dict['sp_follower_count'] = search_result['artists']['items'][0]['followers']['total']
+            artist_dict['sp_follower_count'] = artist['followers']['total']
             
-            # Add Reddit post song and artist to dictionary (allows for merge with input df)
-            artist_dict['r_post_song'] = df['r_post_song'][i]
-            artist_dict['r_post_artist'] = df['r_post_artist'][i]
-            artist_dict['r_media_song'] = df['r_media_song'][i]
-            artist_dict['r_media_artist'] = df['r_media_artist'][i]
-            artist_dict['r_title'] = df['r_title'][i]
-            artist_dict['r_media_title'] = df['r_media_title'][i]
-            artist_dict['r_score'] = df['r_score'][i]
+            # Add Reddit post ID to dictionary (allows for merge with input df)
+            artist_dict['r_post_id'] = df['r_post_id'][i]
             # Save artist dictionaries in list
             artist_list.append(artist_dict)
         
-        except IndexError:
+        except TypeError:
             # If the artist was not found via the Spotify API search, save the artist to a list
             not_found.append(query)
             continue
     
     # Convert genres to DataFrame
     artist_data = pd.DataFrame(artist_list)    
-    # Reindex columns so song and artist are first
-    artist_data = artist_data.reindex(columns=(['r_title', 'r_media_title', 'r_post_song', 'r_post_artist', 'r_media_song',
-                                                'r_media_artist', 'r_score', 'sp_genres', 'sp_artist_popularity',
-                                                'sp_follower_count']))
+    # Reindex columns so the post ID is first
+    artist_data = artist_data.reindex(columns=(['r_post_id', 'sp_genres', 'sp_artist_popularity', 'sp_follower_count']))
     
     return artist_data, not_found
 
@@ -306,19 +234,17 @@ logging.info("\n---Executing 'get_spotify_artist_data'---\n")
 spotify_artist_data, not_found_artists = get_spotify_artist_data(reddit_with_feats)
 logging.info("\n---Expanded DataFrame created: added Spotify artist data")
 logging.info("\n---DataFrame created: artists not found on Spotify---\n")
+log_cache_stats()
+log_latency_histograms()
 
 
 # Merge combined Spotify DataFrame with top songs DataFrame
-song_data = reddit_with_feats.merge(spotify_artist_data, on=['r_post_song', 'r_post_artist', 
-                                                                  'r_score', 'r_title', 'r_media_title', 
-                                                                  'r_media_song', 'r_media_artist'], how='outer')
+song_data = reddit_with_feats.merge(spotify_artist_data, on='r_post_id', how='left', validate='one_to_one')
 logging.info("\n---Merged expanded Spotify DataFrame and Reddit Top 150 DataFrames---\n")                                                                   
 
 
-# Drop post_media_data as the dictionaries in the column are non-hashable to allow for dropping duplicates
+# Drop post_media_data, the raw media data isn't used after the links are extracted
 song_data.drop(columns=['r_media_data'], inplace=True)
-# Drop duplicate rows
-song_data.drop_duplicates(inplace=True)
 
 # Reset index
 song_data.reset_index(inplace=True)
@@ -326,8 +252,11 @@ song_data.reset_index(inplace=True)
 song_data = song_data.drop(columns=['index'])
 
 # Export song data to CSV
-song_data.to_csv("data/spotify_song_data_%s.csv" % (str(datetime.date.today())), index=None)
-logging.info("\n---CSV created: 'spotify_song_data_%s'---\n" % (str(datetime.date.today())))                                                                   
+save_snapshot(song_data, 'spotify_song_data', str(datetime.date.today()))
+logging.info("\n---CSV created: 'spotify_song_data_%s'---\n" % (str(datetime.date.today())))
+
+# Add today's songs to the archive search index
+update_song_index(str(datetime.date.today()), 'spotify')                                                                   
 
 ###---Make Spotify-specific DataFrame---###
 
@@ -340,29 +269,11 @@ keys_list = ['C', 'D', 'Db/C#', 'Eb', 'E', 'F', 'Gb/F#', 'G', 'Ab', 'A', 'Bb', '
 sp['key'] = sp['key'].apply(lambda x: keys_list[int(x)])
 
 # Make decimal values more readable
-sp[['energy', 'danceability', 'speechiness', 'acousticness', 'instrumentalness', 'liveness', 'valence', 'r_upvote_ratio']] = (sp[['loudness', 'energy', 'danceability', 'speechiness', 'acousticness', 'instrumentalness', 'liveness', 'valence']] * 100).round(2)
-
-def format_ms(milliseconds):
-    """
-    Inputs a timestamp in milliseconds and returns a string in format MM:SS.
-    """
-    milliseconds = int(milliseconds)
-    
-    seconds = int((milliseconds/1000)%60)
-    seconds = str(seconds)
-    if len(seconds) != 2: 
-        seconds = '0' + seconds
-        
-    minutes = int((milliseconds/(1000*60))%60)
-    minutes = str(minutes)
-    if len(minutes) != 2: 
-        minutes = '0' + minutes
-
-    return (minutes + ':' + seconds)
+percent_columns = ['energy', 'danceability', 'speechiness', 'acousticness', 'instrumentalness', 'liveness', 'valence', 'r_upvote_ratio']
+sp[percent_columns] = (sp[percent_columns] * 100).round(2)
 
 # Convert milliseconds to MM:SS
-for i, row in sp.iterrows():
-    sp['duration_ms'][i] = format_ms(sp['duration_ms'][i])
+sp['duration_ms'] = format_ms(sp['duration_ms'])
 
 sp['sp_artist_popularity'].fillna(0, inplace=True) # fill NaNs
 sp['sp_artist_popularity'] = sp['sp_artist_popularity'].astype(int) # convert to int
@@ -370,42 +281,13 @@ sp['sp_artist_popularity'] = sp['sp_artist_popularity'].astype(int) # convert to
 sp['tempo'] = sp['tempo'].astype(int) # convert to int
 
 # Clean up 'explicit' values
-sp['sp_explicit'] = sp['sp_explicit'].astype(str)
-
-for i, row in sp.iterrows():
-    if sp['sp_explicit'][i] == '1.0':
-        sp['sp_explicit'][i] = 'True'
-    elif sp['sp_explicit'][i] == '0.0':
-        sp['sp_explicit'][i] = 'False'
-
-# Format numbers to be human readable - from Stack Overflow rtaft
-def human_format(num):
-    num = float('{:.3g}'.format(num))
-    magnitude = 0
-    while abs(num) >= 1000:
-        magnitude += 1
-        num /= 1000.0
-    return '{}{}'.format('{:f}'.format(num).rstrip('0').rstrip('.'), ['', 'K', 'M', 'B', 'T'][magnitude])
-
-# Convert Spotify follower count and upvotes to human readable number, ex. 1256 to 1.2K
-sp['r_score_readable'] = None
-sp['sp_follower_count_readable'] = None
-
-for i, row in sp.iterrows():
-    try:
-        num = int(sp['sp_follower_count'][i])
-        formatted_num = human_format(num)
-        sp['sp_follower_count_readable'][i] = formatted_num
-    except ValueError:
-        continue
-    try:
-        num = int(sp['r_score'][i])
-        formatted_num = human_format(num)
-        sp['r_score_readable'][i] = formatted_num
-    except ValueError:
-        continue
-
-sp = sp.reindex(columns=['r_title', 'r_post_song', 'r_post_artist', 'r_media_song',
+sp['sp_explicit'] = format_explicit(sp['sp_explicit'])
+
+# Convert Spotify follower count and upvotes to human readable number, ex. 1256 to 1.26K
+sp['r_score_readable'] = human_format(sp['r_score'])
+sp['sp_follower_count_readable'] = human_format(sp['sp_follower_count'])
+
+sp = sp.reindex(columns=['r_post_id', 'r_title', 'r_post_song', 'r_post_artist', 'r_media_song',
                          'r_media_artist', 'sp_song', 'sp_artist', 'r_genres', 'sp_genres',
                          'r_media_title', 'r_post_date', 'r_upvote_ratio', 'r_score',
                             'bc_embed_link', 'link_source', 'sc_embed_link',
@@ -415,8 +297,8 @@ sp = sp.reindex(columns=['r_title', 'r_post_song', 'r_post_artist', 'r_media_son
                            'valence', 'tempo', 'type', 'uri', 'track_href', 'analysis_url',
                            'duration_ms', 'time_signature', 'sp_artwork_640px', 'sp_release_date',
                            'sp_release_year', 'sp_explicit', 'sp_popularity', 'sp_audio_preview',
-                            'sp_artist_popularity', 'sp_follower_count'])
+                            'sp_artist_popularity', 'sp_follower_count', 'sp_follower_count_readable', 'r_score_readable'])
 
 # Export Spotify DataFrame to CSV
-sp.to_csv("data/spotify_top_100_songs_%s.csv" % (str(datetime.date.today())), index=None)
+save_snapshot(sp, 'spotify_top_100_songs', str(datetime.date.today()))
 logging.info("\n---CSV created: 'spotify_top_100_songs_%s'---\n" % (str(datetime.date.today())))                                                                   
\ No newline at end of file
@@ -0,0 +1,174 @@
+import os
+import re
+import sys
+import ast
+import json
+import time
+import sqlite3
+import datetime
+import threading
+import logging
+from collections import Counter
+import pandas as pd
+from snapshots import DATA_DIR, read_snapshot_file
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+CACHE_PATH = os.path.join(DATA_DIR, 'spotify_cache.sqlite')
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+# Seconds each field of a cached Spotify result stays valid, fields not listed never change
+FIELD_TTLS = {'track_search': {'id': 7 * DAY, 'candidates': 7 * DAY}, # search query -> tracks found
+              'artist_search': {'genres': 7 * DAY, 'popularity': 12 * HOUR, 'followers': 12 * HOUR},
+              'artist': {'genres': 7 * DAY, 'popularity': 12 * HOUR, 'followers': 12 * HOUR}, # artist ID -> artist
+              'audio_features': {},
+              'track': {'popularity': 12 * HOUR}}
+
+# Cache hits and misses per kind of lookup in this process
+stats = Counter()
+
+_connection = None
+_lock = threading.Lock()
+
+###---Read and write the cache---###
+
+def _connect():
+    global _connection
+    if _connection is None:
+        _connection = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _connection.execute('CREATE TABLE IF NOT EXISTS cache (kind TEXT, key TEXT, value TEXT, fetched_at REAL, '
+                            'PRIMARY KEY (kind, key))')
+    return _connection
+
+def max_age(kind, fields=None):
+    """
+    Inputs a kind of lookup and the fields the caller uses (all fields by default)
+    and returns the seconds a cached result stays valid, None if it never expires.
+    """
+    ttls = FIELD_TTLS[kind]
+    ttls = [ttls[field] for field in (ttls if fields is None else fields) if field in ttls]
+
+    return min(ttls) if ttls else None
+
+def cache_get(kind, keys, fields=None, count=True):
+    """
+    Inputs a kind of lookup, a list of keys (e.g. track IDs) and the fields the caller uses and returns
+    a dictionary of key -> cached result for the keys with a result that is still valid for those fields.
+    Hits and misses aren't counted if 'count' is False (e.g. when only checking what is cached).
+    """
+    keys = list(dict.fromkeys(keys))
+    age = max_age(kind, fields)
+    oldest = 0 if age is None else time.time() - age
+    results = {}
+
+    with _lock:
+        connection = _connect()
+        for i in range(0, len(keys), 500): # SQLite limits the number of query parameters
+            batch = keys[i:i + 500]
+            rows = connection.execute('SELECT key, value FROM cache WHERE kind = ? AND fetched_at >= ? AND key IN (%s)'
+                                      % (', '.join('?' * len(batch))), [kind, oldest] + batch)
+            results.update((key, json.loads(value)) for key, value in rows)
+
+        if count:
+            stats[kind, 'hits'] += len(results)
+            stats[kind, 'misses'] += len(keys) - len(results)
+
+    return results
+
+def cache_put(kind, results, fetched_at=None):
+    """
+    Inputs a kind of lookup and a dictionary of key -> result and saves the results
+    (fetched now, unless a timestamp is given).
+    """
+    fetched_at = time.time() if fetched_at is None else fetched_at
+
+    with _lock:
+        connection = _connect()
+        # Never replace a result with an older one
+        connection.executemany('INSERT INTO cache VALUES (?, ?, ?, ?) ON CONFLICT (kind, key) DO UPDATE SET '
+                               'value = excluded.value, fetched_at = excluded.fetched_at WHERE excluded.fetched_at >= cache.fetched_at',
+                               [(kind, key, json.dumps(value), fetched_at) for key, value in results.items()])
+        connection.commit()
+
+def log_cache_stats():
+    """
+    Logs the cache hit rate of each kind of lookup made in this process.
+    """
+    for kind in FIELD_TTLS:
+        hits, misses = stats[kind, 'hits'], stats[kind, 'misses']
+        if hits + misses:
+            logging.info("\n---Spotify cache: %s %s hits, %s misses (%.0f%% hit rate)---\n"
+                         % (kind, hits, misses, 100 * hits / (hits + misses)))
+
+###---Warm the cache from the archive---###
+
+AUDIO_FEATURE_COLUMNS = ['danceability', 'energy', 'key', 'loudness', 'mode', 'speechiness', 'acousticness',
+                         'instrumentalness', 'liveness', 'valence', 'tempo', 'type', 'id', 'uri', 'track_href',
+                         'analysis_url', 'duration_ms', 'time_signature']
+
+def _archive_paths(family):
+    pattern = re.compile(r'^%s_(\d{4}-\d{2}-\d{2})\.csv$' % (family))
+    return sorted((match.group(1), os.path.join(DATA_DIR, match.group(0)))
+                  for match in map(pattern.match, os.listdir(DATA_DIR)) if match)
+
+def _timestamp(date):
+    return datetime.datetime.strptime(date, '%Y-%m-%d').timestamp()
+
+def _value(value):
+    # Plain Python values for JSON (NaN -> None, numpy numbers -> int/float)
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+def warm_cache():
+    """
+    Fills the cache with the audio features and track data in every archived 'spotify_raw_data' file
+    and the artist data (by name and by ID) in every 'spotify_song_data' file, dated by the day they were fetched.
+    Results already cached from a later day are kept. Returns the number of results per kind.
+    """
+    counts = Counter()
+
+    for date, path in _archive_paths('spotify_raw_data'):
+        raw = read_snapshot_file(path).dropna(subset=['id']).drop_duplicates('id')
+        features, tracks = {}, {}
+        for row in raw.to_dict('records'):
+            row = {column: _value(value) for column, value in row.items()}
+            features[row['id']] = {column: row[column] for column in AUDIO_FEATURE_COLUMNS}
+            tracks[row['id']] = {'id': row['id'], 'name': row['sp_song'], 'artists': [{'name': row['sp_artist'], 'id': row.get('sp_artist_id')}],
+                                 'album': {'images': [{'url': row['sp_artwork_640px']}], 'release_date': row['sp_release_date']},
+                                 'explicit': row['sp_explicit'], 'popularity': row['sp_popularity'],
+                                 'preview_url': row['sp_audio_preview']}
+        cache_put('audio_features', features, _timestamp(date))
+        cache_put('track', tracks, _timestamp(date))
+        counts['audio_features'] += len(features)
+        counts['track'] += len(tracks)
+
+    for date, path in _archive_paths('spotify_song_data'):
+        song_data = read_snapshot_file(path).dropna(subset=['sp_artist', 'sp_artist_popularity']).drop_duplicates('sp_artist')
+        artists, artists_by_id = {}, {}
+        for row in song_data.to_dict('records'):
+            genres = ast.literal_eval('[%s]' % (row['sp_genres'])) if isinstance(row['sp_genres'], str) else []
+            artist = {'name': row['sp_artist'], 'genres': genres,
+                      'popularity': _value(row['sp_artist_popularity']),
+                      'followers': {'total': _value(row['sp_follower_count'])}}
+            artists[row['sp_artist']] = artist
+            if isinstance(row.get('sp_artist_id'), str): # saved since artists are looked up by ID
+                artists_by_id[row['sp_artist_id']] = dict(artist, id=row['sp_artist_id'])
+        cache_put('artist_search', artists, _timestamp(date))
+        cache_put('artist', artists_by_id, _timestamp(date))
+        counts['artist_search'] += len(artists)
+        counts['artist'] += len(artists_by_id)
+
+    return dict(counts)
+
+if __name__ == '__main__':
+    # Usage: python spotify_cache.py --warm
+    if sys.argv[1:] == ['--warm']:
+        start = time.perf_counter()
+        counts = warm_cache()
+        print('Warmed %s in %.1f s' % (', '.join('%s %s' % (count, kind) for kind, count in counts.items()), time.perf_counter() - start))
+    with _lock:
+        for kind, count in _connect().execute('SELECT kind, COUNT(*) FROM cache GROUP BY kind'):
+            print('%8s  %s' % (count, kind))
@@ -1,9 +1,13 @@
 import pandas as pd
 import datetime
-from IPython.display import HTML
 import warnings
 from pandas.core.common import SettingWithCopyWarning
 import logging
+from snapshots import read_snapshot, save_snapshot
+from chart_html import save_chart_html, chart_image_urls
+from thumbnails import CHART_BOX, EXTREMES_BOX, cache_thumbnails
+from dashboard import save_daily_stats
+from formatting import human_format, format_int
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -11,9 +15,9 @@ logging.basicConfig(level=logging.INFO)
 warnings.simplefilter(action="ignore", category=SettingWithCopyWarning)
 
 # Import data
-sp = pd.read_csv("data/spotify_top_100_songs_%s.csv" % (str(datetime.date.today())))
+sp = read_snapshot('spotify_top_100_songs', str(datetime.date.today()))
 logging.critical("\n---DataFrame created from import 'spotify_top_100_songs_%s.csv'---\n" % (str(datetime.date.today())))
-song_data = pd.read_csv("data/spotify_song_data_%s.csv" % (str(datetime.date.today())))
+song_data = read_snapshot('spotify_song_data', str(datetime.date.today()))
 logging.critical("\n---DataFrame created from import 'spotify_song_data_%s.csv'---\n" % (str(datetime.date.today())))
 
 # Get extreme audio features
@@ -74,19 +78,14 @@ min_max['min_value']['loudness'] = min_max['min_value']['loudness'] / 100
 # min_max.drop(['max_link', 'min_link'], axis=1, inplace=True)
 
 # Export min and max audio feature tracks DataFrame to CSV
-min_max.to_csv("data/spotify_extremes_%s.csv" % (str(datetime.date.today())), index=None)
+save_snapshot(min_max, 'spotify_extremes', str(datetime.date.today()))
 logging.info("\n---CSV created: 'spotify_extremes_%s'---\n" % (str(datetime.date.today())))
 
-###---Build DataFrame for Top 100 chart---###
+# Precompute the aggregates shown on the Dashboard
+save_daily_stats(str(datetime.date.today()))
+logging.info("\n---JSON created: 'spotify_stats_%s'---\n" % (str(datetime.date.today())))
 
-# Format numbers to be human readable - from Stack Overflow rtaft
-def human_format(num):
-    num = float('{:.3g}'.format(num))
-    magnitude = 0
-    while abs(num) >= 1000:
-        magnitude += 1
-        num /= 1000.0
-    return '{}{}'.format('{:f}'.format(num).rstrip('0').rstrip('.'), ['', 'K', 'M', 'B', 'T'][magnitude])
+###---Build DataFrame for Top 100 chart---###
 
 # Spotify chart
 chart_df = song_data.reindex(columns=(['sp_artwork_640px', 'id', 'sp_artist', 'sp_song', 'r_genres', 'r_score', 
@@ -95,33 +94,18 @@ chart_df = song_data.reindex(columns=(['sp_artwork_640px', 'id', 'sp_artist', 's
 logging.info("\n---DataFrame created: chart for Reddit/overall top songs (not cleaned up)---\n")
 
 # Combine artwork and Spotify links in same column and remove link column
-for i, row in chart_df.iterrows():
-    chart_df['sp_artwork_640px'][i] = str(chart_df['sp_artwork_640px'][i]) + ", https://open.spotify.com/track/" + str(chart_df['id'][i]) 
+chart_df['sp_artwork_640px'] = chart_df['sp_artwork_640px'].astype(str) + ", https://open.spotify.com/track/" + chart_df['id'].astype(str)
 
 chart_df.drop('id', axis=1, inplace=True)
 
-# Fill NaNs to transform float columns to int with unique string that can be removed later
-chart_df.fillna('10101010101010', inplace=True)
 # Convert float columns to int
-chart_df[['r_score', 'sp_popularity', 'sp_artist_popularity', 'sp_follower_count']] = chart_df[['r_score', 'sp_popularity', 'sp_artist_popularity', 'sp_follower_count']].astype(int)
-# Replace unique NaN replacement string with dash indicating no data
-chart_df.replace(to_replace=10101010101010, value='-', inplace=True)
-chart_df.replace(to_replace='10101010101010', value='-', inplace=True)
-
-# Convert Spotify follower count to human readable number, ex. 1256 to 1.2K
-for i, row in chart_df.iterrows():
-    try:
-        num = int(chart_df['sp_follower_count'][i])
-        formatted_num = human_format(num)
-        chart_df['sp_follower_count'][i] = formatted_num
-    except ValueError:
-        continue
-    try:
-        num = int(chart_df['r_score'][i])
-        formatted_num = human_format(num)
-        chart_df['r_score'][i] = formatted_num
-    except ValueError:
-        continue
+chart_df['sp_popularity'] = format_int(chart_df['sp_popularity'])
+chart_df['sp_artist_popularity'] = format_int(chart_df['sp_artist_popularity'])
+# Convert Spotify follower count and upvotes to human readable number, ex. 1256 to 1.26K
+chart_df['sp_follower_count'] = human_format(chart_df['sp_follower_count'])
+chart_df['r_score'] = human_format(chart_df['r_score'])
+# Dash indicating no data
+chart_df.fillna('-', inplace=True)
         
 # Rename columns
 chart_df.rename(columns={'sp_artwork_640px': 'Artwork', 'sp_artist': 'Artist', 'sp_song': 'Song', 'r_genres': 'Genre(s) on Reddit',
@@ -140,7 +124,16 @@ chart_sp_top_100 = chart_df.loc[chart_df['Spotify song popularity (0-100)'] != '
 logging.info("\n---DataFrame created: chart for Spotify top 100 songs---\n")
 
 # Export chart data DataFrames to CSV file
-chart_top_100.to_csv("data/chart_reddit_%s.csv" % (str(datetime.date.today())), index=None) # General Top 100
+save_snapshot(chart_top_100, 'chart_reddit', str(datetime.date.today())) # General Top 100
 logging.info("\n---CSV created: 'chart_reddit_%s'---\n" % (str(datetime.date.today())))
-chart_sp_top_100.to_csv("data/chart_spotify_%s.csv" % (str(datetime.date.today())), index=None) # Spotify Top 100
-logging.info("\n---CSV created: 'chart_spotify_%s'---\n" % (str(datetime.date.today())))
\ No newline at end of file
+save_snapshot(chart_sp_top_100, 'chart_spotify', str(datetime.date.today())) # Spotify Top 100
+logging.info("\n---CSV created: 'chart_spotify_%s'---\n" % (str(datetime.date.today())))
+
+# Downsize artwork to the sizes shown in the web app
+logging.info("\n---Executing 'cache_thumbnails'...---\n")
+cache_thumbnails(chart_image_urls('chart_spotify', str(datetime.date.today())), CHART_BOX)
+cache_thumbnails(list(min_max['max_artwork']) + list(min_max['min_artwork']), EXTREMES_BOX)
+
+# Pre-render the chart served by the web app
+save_chart_html('chart_spotify', str(datetime.date.today()))
+logging.info("\n---HTML created: 'chart_spotify_%s'---\n" % (str(datetime.date.today())))
\ No newline at end of file
@@ -0,0 +1,230 @@
+import os
+import time
+import threading
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from spotify_cache import cache_get, cache_put
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+# Most IDs per request accepted by the Spotify API endpoints
+AUDIO_FEATURES_BATCH = 100
+TRACKS_BATCH = 50
+ARTISTS_BATCH = 50
+# Tracks kept per search, to pick the one closest to the Reddit post
+SEARCH_LIMIT = 5
+
+# Requests in flight at once and requests per second across all of them
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = float(os.environ.get('SPOTIFY_REQUESTS_PER_SECOND', 20))
+# Attempts per request when Spotify answers 429 Too Many Requests
+MAX_ATTEMPTS = 5
+# Upper bounds (ms) of the latency histogram buckets
+LATENCY_BUCKETS = [50, 100, 200, 400, 800, 1600, float('inf')]
+
+###---Rate limiting---###
+
+class TokenBucket:
+    """
+    Shared by all threads calling the Spotify API: each request takes a token, tokens refill at
+    'rate' per second up to 'capacity'. A 429 response pauses every thread for its Retry-After.
+    """
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+bucket = TokenBucket(REQUESTS_PER_SECOND, REQUESTS_PER_SECOND)
+latencies = Counter() # (endpoint, bucket upper bound) -> number of calls
+_latencies_lock = threading.Lock()
+
+def call_spotify(endpoint, function, *args, **kwargs):
+    """
+    Inputs an endpoint name (for the latency stats), a Spotify client method and its arguments and
+    calls it once a token is available. Retries after the Retry-After time when rate limited.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        bucket.acquire()
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except Exception as e:
+            if getattr(e, 'http_status', None) != 429 or attempt == MAX_ATTEMPTS:
+                raise
+            retry_after = float((getattr(e, 'headers', None) or {}).get('Retry-After', 1))
+            logging.warning("\n---Spotify rate limit reached, pausing requests for %s s---\n" % (retry_after))
+            bucket.pause(retry_after)
+        finally:
+            milliseconds = (time.perf_counter() - start) * 1000
+            with _latencies_lock:
+                latencies[endpoint, next(bound for bound in LATENCY_BUCKETS if milliseconds <= bound)] += 1
+
+def log_latency_histograms():
+    """
+    Logs the number of Spotify API calls per latency bucket for each endpoint called in this process.
+    """
+    for endpoint in sorted(set(endpoint for endpoint, _ in latencies)):
+        counts = ['<=%s ms: %s' % (bound, latencies[endpoint, bound]) for bound in LATENCY_BUCKETS[:-1]]
+        counts.append('>%s ms: %s' % (LATENCY_BUCKETS[-2], latencies[endpoint, LATENCY_BUCKETS[-1]]))
+        logging.info("\n---Spotify %s latency (%s calls): %s---\n"
+                     % (endpoint, sum(latencies[endpoint, bound] for bound in LATENCY_BUCKETS), ', '.join(counts)))
+
+def map_concurrently(function, items):
+    """
+    Inputs a function and a list and returns the list of results, with up to MAX_WORKERS calls at once.
+    """
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        return list(executor.map(function, items))
+
+###---Cached lookups---###
+
+def cached_lookup(kind, keys, fetch, fields=None):
+    """
+    Inputs a kind of lookup (see spotify_cache.py), a list of keys, a function fetching a dictionary
+    of key -> result for a list of keys and the fields the caller uses. Returns a dictionary of
+    key -> result, fetching only the keys without a valid cached result. Results are cached if found.
+    """
+    results = cache_get(kind, keys, fields)
+    missing = [key for key in dict.fromkeys(keys) if key not in results]
+    if missing:
+        fetched = fetch(missing)
+        cache_put(kind, {key: result for key, result in fetched.items() if result is not None})
+        results.update(fetched)
+
+    return results
+
+###---Search---###
+
+def track_candidates(result):
+    """
+    Inputs a cached or new track search result and returns its list of tracks found.
+    """
+    # Searches cached before the other results were kept only have the first track's ID
+    if 'candidates' in result:
+        return result['candidates']
+    return [{'id': result['id'], 'name': None, 'artist': None}] if result['id'] else []
+
+def cached_track_searches(queries):
+    """
+    Inputs a list of search strings and returns a dictionary of search string -> list of tracks found
+    for the searches with a valid cached result, without any API request.
+    """
+    return {query: track_candidates(result) for query, result in cache_get('track_search', queries, count=False).items()}
+
+def search_tracks(sp, queries):
+    """
+    Inputs a Spotify client and a list of search strings and returns a dictionary of search string ->
+    list of the first SEARCH_LIMIT tracks found, each a dictionary with the track ID, name and first artist
+    (see 'song_matching.py' for picking one). Searches run concurrently.
+    """
+    def search(query):
+        try:
+            items = call_spotify('search', sp.search, q=query, type='track', limit=SEARCH_LIMIT)['tracks']['items']
+        except (KeyError, TypeError):
+            items = []
+        # remembered if empty too, songs not on Spotify aren't searched again for a while
+        return {'candidates': [{'id': item['id'], 'name': item['name'], 'artist': item['artists'][0]['name']}
+                               for item in items if item]}
+
+    results = cached_lookup('track_search', queries, lambda missing: dict(zip(missing, map_concurrently(search, missing))))
+
+    return {query: track_candidates(result) for query, result in results.items()}
+
+def search_artists(sp, queries):
+    """
+    Inputs a Spotify client and a list of artist names and returns a dictionary of
+    artist name -> data of the first artist found (or None). Searches run concurrently.
+    """
+    def search(query):
+        try:
+            return call_spotify('search', sp.search, q=query, type='artist')['artists']['items'][0]
+        except (IndexError, KeyError, TypeError):
+            return None
+
+    return cached_lookup('artist_search', [str(query) for query in queries],
+                         lambda missing: dict(zip(missing, map_concurrently(search, missing))))
+
+###---Batched lookups---###
+
+def chunks(items, size):
+    """
+    Inputs a list and a size and returns the list split into lists of at most that size.
+    """
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def fetch_in_batches(ids, fetch, size):
+    """
+    Inputs a list of IDs, a function fetching the results of a list of IDs (in the same order)
+    and a batch size and returns a dictionary of ID -> result (None if not found). Batches are
+    fetched concurrently. If a batch fails, e.g. because one of its IDs isn't a valid track ID,
+    its IDs are fetched one by one.
+    """
+    def fetch_batch(batch):
+        try:
+            return list(zip(batch, fetch(batch)))
+        except LookupError: # no recorded response in replay mode (see api_clients.py), not an invalid ID
+            raise
+        except Exception as e:
+            logging.warning("\n---Batch of %s IDs failed, fetching one by one: %s---\n" % (len(batch), e))
+            results = []
+            for track_id in batch:
+                try:
+                    results.append((track_id, fetch([track_id])[0]))
+                except LookupError:
+                    raise
+                except Exception:
+                    results.append((track_id, None))
+            return results
+
+    batches = map_concurrently(fetch_batch, chunks(list(dict.fromkeys(ids)), size))
+
+    return dict(result for batch in batches for result in batch)
+
+def fetch_audio_features(sp, track_ids):
+    """
+    Inputs a Spotify client and a list of track IDs and returns a dictionary of track ID -> audio features.
+    """
+    def fetch(batch):
+        return call_spotify('audio_features', sp.audio_features, tracks=batch)
+
+    return cached_lookup('audio_features', track_ids, lambda missing: fetch_in_batches(missing, fetch, AUDIO_FEATURES_BATCH))
+
+def fetch_tracks(sp, track_ids):
+    """
+    Inputs a Spotify client and a list of track IDs and returns a dictionary of track ID -> track data.
+    """
+    def fetch(batch):
+        return call_spotify('tracks', sp.tracks, batch, market=None)['tracks']
+
+    return cached_lookup('track', track_ids, lambda missing: fetch_in_batches(missing, fetch, TRACKS_BATCH))
+
+def fetch_artists(sp, artist_ids):
+    """
+    Inputs a Spotify client and a list of artist IDs and returns a dictionary of artist ID -> artist data.
+    """
+    def fetch(batch):
+        return call_spotify('artists', sp.artists, batch)['artists']
+
+    return cached_lookup('artist', artist_ids, lambda missing: fetch_in_batches(missing, fetch, ARTISTS_BATCH))
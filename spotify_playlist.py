@@ -1,11 +1,9 @@
-import pandas as pd
 import datetime
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
 import warnings
 from pandas.core.common import SettingWithCopyWarning
 import logging
-from user_credentials import S_CLIENT_ID, S_SECRET_KEY, S_USERNAME, S_REDIRECT_URI
+from snapshots import read_snapshot
+from api_clients import credential, spotify_user_client
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -13,17 +11,14 @@ logging.basicConfig(level=logging.INFO)
 warnings.simplefilter(action="ignore", category=SettingWithCopyWarning)
 
 # Import data
-song_data = pd.read_csv("data/spotify_top_100_songs_%s.csv" % (str(datetime.date.today())))
+song_data = read_snapshot('spotify_top_100_songs', str(datetime.date.today()))
 logging.critical("\n---DataFrame created from import 'spotify_song_data_%s.csv'---\n" % (str(datetime.date.today())))
 
-# Get user access to edit Spotify playlist
-username = S_USERNAME
+# Get user access to edit Spotify playlist (or recorded responses, see api_clients.py)
+username = credential('S_USERNAME')
 scope = 'playlist-modify-public'
 
-token = spotipy.util.prompt_for_user_token(username, scope, client_id=S_CLIENT_ID,
-                                           client_secret=S_SECRET_KEY, redirect_uri=S_REDIRECT_URI)
-
-sp = spotipy.Spotify(auth=token)
+sp = spotify_user_client(scope)
 
 logging.critical("\n---Connected to Spotify API: access to edit user playlist---\n")
 
@@ -34,13 +29,13 @@ track_ids = list(song_data[['id']].loc[~(song_data['id'].isna())]['id']) # exclu
 track_ids_100 = track_ids[0:100]
 
 # Get user playlists and get playlist ID of first entry
-playlists = sp.user_playlists(S_USERNAME, limit=50, offset=0)
+playlists = sp.user_playlists(username, limit=50, offset=0)
 playlist_id = playlists['items'][0]['id']
 
 ###---Make new playlist and add 100 tracks---###
 
 # Create new public playlist for user
-#new_playlist = sp.user_playlist_create(S_USERNAME, 'r/ Daily Hot 100', public=True, collaborative=False, description='The top 100 recommended songs on r/music and r/listentothis found on Spotify every day.')
+#new_playlist = sp.user_playlist_create(username, 'r/ Daily Hot 100', public=True, collaborative=False, description='The top 100 recommended songs on r/music and r/listentothis found on Spotify every day.')
 
 # Get playlist ID
 #new_playlist_id = new_playlist['id']
@@ -51,7 +46,7 @@ playlist_id = playlists['items'][0]['id']
 ###---Replace existing tracks with new 100 tracks---###
 
 # Replace tracks in existing playlist
-sp.user_playlist_replace_tracks(S_USERNAME, playlist_id, track_ids_100)
+sp.user_playlist_replace_tracks(username, playlist_id, track_ids_100)
 logging.info("\n---Replaced Spotify playlist tracks---\n")
 
 # Get Spotify player embed code for the playlist to add to Streamlit 
@@ -0,0 +1,157 @@
+import re
+import logging
+from collections import Counter
+import emoji
+import pandas as pd
+from spotify_lookup import cached_track_searches, search_tracks
+from song_matching import match_scores, best_matches
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+# Match score (see song_matching.py) of a track found that is trusted without trying other queries,
+# about 95% of the archived search results scoring this high are by the artist parsed from the Reddit post
+# (python bench_song_matching.py --confident)
+CONFIDENT_SCORE = 80
+
+# Search queries tried for a post until one finds a track scoring CONFIDENT_SCORE, in this order
+QUERY_STAGES = ['post query', 'media query', 'cleaned query', 'first artist', 'without first word']
+
+###---Fallback queries---###
+
+def clean_spotify_query(string):
+    """
+    Inputs a string with 'artist name' + ' ' + 'song title' and returns
+    a cleaned string (remove special characters etc.)
+    """
+    remove_emojis = emoji.replace_emoji(string, '') # remove emojis
+    #to_ascii = unidecode(no_emojis) # replace non-ASCII characters with ASCII equivalent
+    remove_non_ascii = remove_emojis.encode("ascii", "ignore") # remove non-ASCII characters (encoding)
+    remove_non_ascii_2 = remove_non_ascii.decode() # remove non-ASCII characters (decoding)
+    dash_to_space = re.sub('-', ' ', remove_non_ascii_2) # replace dashes with space, ex. inside artist name
+    space_before_capitals = re.sub(r"(?<=\w)([A-Z])", r" \1", dash_to_space) # put space before capital letters, ex. HaHa = Ha Ha
+    until_feat = re.findall('^.*?(?=feat\.|feat|ft\.|ft|f\/|f\.|Feat\.|Ft\.)', space_before_capitals) # keep text up to 'feat', i.e. featured artists
+
+    if until_feat == []:
+        return space_before_capitals # for titles without a featuring artist
+    else:
+        return until_feat[0] # for titles with a featuring artist
+
+def remove_first_word(string):
+    """
+    Returns a string with the first word removed.
+    """
+    words = string.split()
+    no_first_word = ' '.join(words[1:])
+
+    return no_first_word
+
+def separate_multiple_artists(string):
+    """
+    Inputs a string of a song artist. If there are multiple artist names,
+    it will return a list of artist names.
+    """
+    # Check for multiple artists by finding 'feat.', '&', ' X ', etc. in artist name
+    artists = re.findall('&|\sx\s|\sX\s|\+|,|\sand\s|feat\.|feat|ft\.|ft|f\/|f\.|Feat\.|Ft\.', string)
+
+    if artists != []:
+        return re.split('&|\sx\s|\sX\s|\+|,|\sand\s|feat\.|feat|ft\.|ft|f\/|f\.|Feat\.|Ft\.', string)
+
+###---Resolution plan---###
+
+def search_query(song, artist):
+    """
+    Inputs a parsed song title and artist name and returns the search string,
+    None if either is missing (the title couldn't be parsed).
+    """
+    if pd.isna(song) or pd.isna(artist):
+        return None
+
+    return str(song) + ' ' + str(artist)
+
+def planned_queries(row):
+    """
+    Inputs a row of Reddit data and returns a dictionary of stage -> search strings to try
+    (see QUERY_STAGES), each search string in the first stage it appears in.
+    """
+    parsed = [(row['r_post_song'], row['r_post_artist']), (row['r_media_song'], row['r_media_artist'])]
+    parsed = [(str(song), str(artist)) for song, artist in parsed if search_query(song, artist) is not None]
+    stages = {'post query': [search_query(row['r_post_song'], row['r_post_artist'])],
+              'media query': [search_query(row['r_media_song'], row['r_media_artist'])],
+              'cleaned query': [clean_spotify_query(song + ' ' + artist) for song, artist in parsed],
+              'first artist': [song + ' ' + artists[0] for song, artist in parsed
+                               for artists in [separate_multiple_artists(artist)] if artists],
+              'without first word': [song + ' ' + remove_first_word(artist) for song, artist in parsed
+                                     if len(artist.split()) > 1]}
+
+    seen = set()
+    plan = {}
+    for stage in QUERY_STAGES:
+        queries = [' '.join(query.split()) for query in stages[stage] if query is not None and query.strip()]
+        plan[stage] = [query for query in dict.fromkeys(queries) if query not in seen]
+        seen.update(plan[stage])
+
+    return plan
+
+def resolve_tracks(sp, df):
+    """
+    Inputs a Spotify client and a DataFrame of Reddit posts with the 'track_id' of Spotify links posted
+    on Reddit and returns a dictionary of post index -> track ID (None if not found) and a dictionary of
+    the number of posts resolved per stage and searches made. Each post uses the cheapest source first:
+    the Spotify link, then searches already cached, then the stages of QUERY_STAGES (searched concurrently
+    for all posts in a stage), stopping at the first track scoring CONFIDENT_SCORE. Posts without one
+    get the best scoring track found by any query.
+    """
+    track_ids = {i: df['track_id'][i] for i in df.index if df['track_id'][i] != None}
+    plans = {i: planned_queries(df.loc[i]) for i in df.index if i not in track_ids}
+    stats = Counter({'Spotify link': len(track_ids)})
+
+    candidates = []
+    def score(new_candidates):
+        # Scores the tracks found for each post and returns the posts with a confident match
+        new_candidates = pd.DataFrame(new_candidates, columns=['post', 'id', 'name', 'artist'])
+        posts = df.loc[new_candidates['post']]
+        new_candidates['match_score'] = match_scores(new_candidates['artist'], new_candidates['name'],
+                                                     [(posts['r_post_artist'], posts['r_post_song']),
+                                                      (posts['r_media_artist'], posts['r_media_song'])])
+        candidates.append(new_candidates)
+        return set(new_candidates['post'][new_candidates['match_score'] >= CONFIDENT_SCORE])
+
+    # Searches already cached cost nothing, use them first
+    planned = [query for plan in plans.values() for queries in plan.values() for query in queries]
+    cached = cached_track_searches(planned)
+    resolved = score([dict(track, post=i) for i, plan in plans.items() for queries in plan.values()
+                      for query in queries if query in cached for track in cached[query]])
+    stats['cache'] = len(resolved)
+
+    searched = set()
+    for stage in QUERY_STAGES:
+        queries = [(i, query) for i, plan in plans.items() if i not in resolved for query in plan[stage] if query not in cached]
+        results = search_tracks(sp, [query for _, query in queries])
+        searched.update(query for _, query in queries)
+        stage_resolved = score([dict(track, post=i) for i, query in queries for track in results[query]])
+        stats[stage] = len(stage_resolved - resolved)
+        resolved |= stage_resolved
+
+    # Best track found for each post, confident or not
+    candidates = pd.concat(candidates, ignore_index=True)
+    best = candidates.loc[best_matches(candidates['match_score'], candidates['post'])]
+    track_ids.update((i, None) for i in plans)
+    track_ids.update(zip(best['post'], best['id']))
+    stats['not confident'] = len(set(plans) - resolved)
+    stats['searches'] = len(searched)
+
+    # Without a plan, the post and media queries of every post were searched unless cached
+    unplanned = set(query for plan in plans.values() for stage in QUERY_STAGES[:2] for query in plan[stage])
+    stats['searches without plan'] = len(unplanned - set(cached))
+
+    return track_ids, dict(stats)
+
+def log_resolution_stats(stats):
+    """
+    Logs the number of posts resolved per source and the searches saved by the resolution plan.
+    """
+    sources = ['Spotify link', 'cache'] + QUERY_STAGES + ['not confident']
+    logging.info("\n---Spotify tracks resolved: %s---\n" % (', '.join('%s %s' % (source, stats.get(source, 0)) for source in sources)))
+    logging.info("\n---Spotify searches: %s made, %s saved (%s without the resolution plan)---\n"
+                 % (stats['searches'], stats['searches without plan'] - stats['searches'], stats['searches without plan']))
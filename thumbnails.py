@@ -0,0 +1,139 @@
+import os
+import io
+import sys
+import json
+import base64
+import hashlib
+import functools
+import logging
+from snapshots import DATA_DIR, load_cached
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+THUMBNAIL_DIR = os.path.join(DATA_DIR, 'thumbnails')
+# Maps 'image url@WxH' to the content-addressed thumbnail filename
+INDEX_PATH = os.path.join(THUMBNAIL_DIR, 'index.json')
+# If the thumbnail folder is published (e.g. to a bucket), images in HTML are linked from there
+THUMBNAIL_BASE_URL = os.environ.get('THUMBNAIL_BASE_URL')
+# Otherwise thumbnails are inlined into HTML as data URIs, as Streamlit 1.11 has no route for local
+# files. Unchanged HTML is sent once per session, reruns send a reference to it (see minCachedMessageSize
+# in setup.sh).
+# Set THUMBNAIL_DATA_URIS=0 to link the original images instead
+THUMBNAIL_DATA_URIS = os.environ.get('THUMBNAIL_DATA_URIS', '1') == '1'
+
+# Bounding boxes (width, height) matching the display sizes in the app
+CHART_BOX = (1000, 124) # charts: max-height 124px
+EXTREMES_BOX = (380, 1000) # extremes page: width 380px
+
+###---Make thumbnails---###
+
+def _index_key(url, box):
+    return '%s@%sx%s' % (url, box[0], box[1])
+
+def _read_index(path=INDEX_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def make_thumbnail(url, box):
+    """
+    Inputs an image URL and a (width, height) bounding box, downloads the image
+    and saves a JPEG scaled down to fit the box in 'data/thumbnails', named by the
+    hash of its content. Returns the thumbnail filename.
+    """
+    # Only the pipeline makes thumbnails, keep these out of the web app's imports
+    import requests
+    from PIL import Image
+
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+    image = Image.open(io.BytesIO(response.content)).convert('RGB')
+    image.thumbnail(box)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=85, optimize=True)
+    content = buffer.getvalue()
+    filename = hashlib.sha1(content).hexdigest() + '.jpg'
+
+    path = os.path.join(THUMBNAIL_DIR, filename)
+    if not os.path.exists(path):
+        with open(path, 'wb') as f:
+            f.write(content)
+
+    return filename
+
+def cache_thumbnails(urls, box):
+    """
+    Inputs a list of image URLs and a bounding box and makes a thumbnail for each URL
+    that doesn't have one for this box yet. Returns the number of new thumbnails.
+    """
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    index = _read_index()
+    made = 0
+
+    for url in set(urls):
+        if not isinstance(url, str) or not url.startswith('http') or _index_key(url, box) in index:
+            continue
+        try:
+            index[_index_key(url, box)] = make_thumbnail(url, box)
+            made += 1
+        except Exception as e:
+            logging.warning("\n---Could not make thumbnail for '%s': %s---\n" % (url, e))
+            continue
+
+    temp_path = INDEX_PATH + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(temp_path, INDEX_PATH)
+
+    logging.info("\n---Thumbnails created: %s new at %sx%s---\n" % (made, box[0], box[1]))
+    return made
+
+###---Use thumbnails---###
+
+def load_index():
+    """
+    Returns the thumbnail index ('image url@WxH' -> filename), read once per process
+    and again only when the pipeline rewrites it. Empty if no thumbnails were made yet.
+    """
+    if not os.path.exists(INDEX_PATH):
+        return {}
+
+    return load_cached(('thumbnails',), INDEX_PATH, _read_index)
+
+@functools.lru_cache(maxsize=1024)
+def _data_uri(filename):
+    """
+    Inputs a thumbnail filename and returns the image as a data URI.
+    Thumbnails are content-addressed and never change, so the result is cached.
+    """
+    with open(os.path.join(THUMBNAIL_DIR, filename), 'rb') as f:
+        return 'data:image/jpeg;base64,' + base64.b64encode(f.read()).decode()
+
+def thumbnail_src(url, box, index=None):
+    """
+    Inputs an image URL, a bounding box and optionally the thumbnail index (see 'load_index')
+    and returns the src to use in an <img> tag: the published thumbnail if THUMBNAIL_BASE_URL is set,
+    otherwise the thumbnail as a data URI unless THUMBNAIL_DATA_URIS=0, otherwise the original URL.
+    """
+    index = load_index() if index is None else index
+    filename = index.get(_index_key(url, box))
+    if filename is None:
+        return url
+    if THUMBNAIL_BASE_URL:
+        return '%s/%s' % (THUMBNAIL_BASE_URL.rstrip('/'), filename)
+    if THUMBNAIL_DATA_URIS:
+        return _data_uri(filename)
+
+    return url
+
+if __name__ == '__main__':
+    # Usage: python thumbnails.py YYYY-MM-DD [YYYY-MM-DD ...] - backfill thumbnails for archived days
+    from snapshots import read_snapshot
+    from chart_html import chart_image_urls
+    for date in sys.argv[1:]:
+        cache_thumbnails(chart_image_urls('chart_spotify', date) + chart_image_urls('chart_youtube', date), CHART_BOX)
+        extremes = read_snapshot('spotify_extremes', date)
+        cache_thumbnails(list(extremes['max_artwork']) + list(extremes['min_artwork']), EXTREMES_BOX)
@@ -1,13 +1,13 @@
 import pandas as pd
 import datetime
-import googleapiclient.discovery
-import googleapiclient.errors
-import re
 from IPython.display import HTML
 import warnings
 from pandas.core.common import SettingWithCopyWarning
 import logging
-from user_credentials import Y_API_KEY
+from snapshots import read_snapshot, save_snapshot
+from song_index import update_song_index
+from api_clients import youtube_client
+from formatting import human_format, format_yt_duration, format_yt_date
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -15,15 +15,11 @@ logging.basicConfig(level=logging.INFO)
 warnings.simplefilter(action="ignore", category=SettingWithCopyWarning)
 
 # Import data
-song_data = pd.read_csv("data/reddit_top_150_songs_%s.csv" % (str(datetime.date.today())))
+song_data = read_snapshot('reddit_top_150_songs', str(datetime.date.today()))
 logging.critical("\n---DataFrame created from import 'reddit_top_150_songs_%s.csv'---\n" % (str(datetime.date.today())))
 
-# YouTube - direct API Key authentication
-api_service_name = "youtube"
-api_version = "v3"
-DEVELOPER_KEY = Y_API_KEY
-
-yt = googleapiclient.discovery.build(api_service_name, api_version, developerKey=DEVELOPER_KEY)
+# YouTube - direct API Key authentication (or recorded responses, see api_clients.py)
+yt = youtube_client()
 
 logging.critical("\n---Connected to YouTube API---\n")
 
@@ -35,7 +31,7 @@ def get_youtube_data(df):
     DataFrame of YouTube data (e.g. view count) for each video. 
     Limited to 100 videos due to API's daily requests quota.
     """
-    video_ids = df['yt_video_id'].dropna()
+    video_ids = df['yt_video_id'].dropna().unique() # videos posted several times are only requested once
 
     video_list = []
     
@@ -83,102 +79,26 @@ logging.info("\n---Executing 'get_youtube_data'...---\n")
 youtube_data = get_youtube_data(song_data) 
 logging.info("\n---DataFrame created: YouTube video data---\n")
 
-# Make numbers human readable
-def human_format(num):
-    num = float('{:.3g}'.format(num))
-    magnitude = 0
-    while abs(num) >= 1000:
-        magnitude += 1
-        num /= 1000.0
-    return '{}{}'.format('{:f}'.format(num).rstrip('0').rstrip('.'), ['', 'K', 'M', 'B', 'T'][magnitude])
-
-# Convert YouTube counts to human readable numbers, ex. 1256 to 1.2K
-youtube_data['view_count_readable'] = None
-youtube_data['like_count_readable'] = None
-youtube_data['comment_count_readable'] = None
-
-for i, row in youtube_data.iterrows():
-    try:
-        num = int(youtube_data['view_count'][i])
-        formatted_num = human_format(num)
-        youtube_data['view_count_readable'][i] = formatted_num
-    except:
-        continue
-    try:
-        num = int(youtube_data['like_count'][i])
-        formatted_num = human_format(num)
-        youtube_data['like_count_readable'][i] = formatted_num
-    except:
-        continue
-    try:
-        num = int(youtube_data['comment_count'][i])
-        formatted_num = human_format(num)
-        youtube_data['comment_count_readable'][i] = formatted_num
-    except:
-        continue
-
-# Make video duration readable
-def format_yt_duration(time_string):
-    """
-    Inputs a time string in format 'PT__H__M__S' from the YouTube API and outputs a time string in foramt HH:MM:SS.
-    """
-    no_letters = re.sub('P|T|S', '', time_string)
-    dividers = re.sub('H|M', ':', no_letters)
-    time_list = dividers.split(':')
-    if len(time_list[0]) == 1:
-        time_list[0] = '0' + time_list[0]
-    try:
-        if len(time_list[1]) == 1:
-            time_list[1] = '0' + time_list[1]
-    except:
-        pass
-    try:
-        if len(time_list[2]) == 1: # If there is a value for hours
-            time_list[2] = '0' + time_list[2]
-    except IndexError:
-        pass
-        
-    formatted_string = ':'.join(time_list[0:])
-    
-    return formatted_string
+# Convert YouTube counts to human readable numbers, ex. 1256 to 1.26K
+for column in ['view_count', 'like_count', 'comment_count']:
+    youtube_data[column + '_readable'] = human_format(youtube_data[column])
 
-# Format YouTube duration values in DataFrame
-youtube_data['vid_duration_readable'] = None
+# Make video duration readable, ex. 'PT4M13S' to 04:13
+youtube_data['vid_duration_readable'] = format_yt_duration(youtube_data['vid_duration'])
 
-for i, row in youtube_data.iterrows():
-    youtube_data['vid_duration_readable'][i] = format_yt_duration(youtube_data['vid_duration'][i])
-
-# Make video publish date readable
-def format_yt_date(datetime_string):
-    """
-    Inputs a datetime string for publish date from the YouTube API with format YYYY-MM-DDTHH:MM:SS and outputs 
-    a date string in format YYYY-MM-DD.
-    """
-    date_time = datetime_string.split('T')
-    date = date_time[0]
-    return date
-
-# Format video publish date
-youtube_data['publish_date_readable'] = None
-
-for i, row in youtube_data.iterrows():
-    youtube_data['publish_date_readable'][i] = format_yt_date(youtube_data['publish_date'][i])
+# Make video publish date readable, ex. '2023-03-13T17:00:00Z' to 2023-03-13
+youtube_data['publish_date_readable'] = format_yt_date(youtube_data['publish_date'])
 
 # Merge formatted YouTube DataFrame with main song DataFrame
-youtube_song_data = song_data.merge(youtube_data, on="yt_video_id")
+youtube_song_data = song_data.merge(youtube_data, on="yt_video_id", validate='many_to_one')
 logging.info("\n---Merged Youtube data and Reddit top 150 songs DataFrames---\n")
 
 # Make Reddit scores human readable
-youtube_song_data['r_score_readable'] = None
-
-for i, row in youtube_data.iterrows():
-    try:
-        num = int(youtube_song_data['r_score'][i])
-        formatted_num = human_format(num)
-        youtube_song_data['r_score_readable'][i] = formatted_num
-    except:
-        continue
+youtube_song_data['r_score_readable'] = human_format(youtube_song_data['r_score'])
 
 # Export YouTube data CSV
-youtube_song_data.to_csv("data/youtube_song_data_%s.csv" % (str(datetime.date.today())), index=None)
-logging.info("\n---CSV created: 'data/youtube_song_data_%s'---\n" % (str(datetime.date.today())))
\ No newline at end of file
+save_snapshot(youtube_song_data, 'youtube_song_data', str(datetime.date.today()))
+logging.info("\n---CSV created: 'data/youtube_song_data_%s'---\n" % (str(datetime.date.today())))
+
+# Add today's songs to the archive search index
+update_song_index(str(datetime.date.today()), 'youtube')
\ No newline at end of file
@@ -3,10 +3,12 @@ import datetime
 import googleapiclient.discovery
 import googleapiclient.errors
 import re
-from IPython.display import HTML
 import warnings
 from pandas.core.common import SettingWithCopyWarning
 import logging
+from snapshots import read_snapshot, save_snapshot
+from chart_html import save_chart_html, chart_image_urls
+from thumbnails import CHART_BOX, cache_thumbnails
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -14,7 +16,7 @@ logging.basicConfig(level=logging.INFO)
 warnings.simplefilter(action="ignore", category=SettingWithCopyWarning)
 
 # Import data
-youtube_song_data = pd.read_csv("data/youtube_song_data_%s.csv" % (str(datetime.date.today())))
+youtube_song_data = read_snapshot('youtube_song_data', str(datetime.date.today()))
 logging.critical("\n---DataFrame created from import 'youtube_song_data_%s.csv'---\n" % (str(datetime.date.today())))
 
 ###---Create YouTube chart---###
@@ -29,8 +31,7 @@ youtube_chart = youtube_song_data.reindex(columns=['thumbnail_standard', 'yt_lin
 logging.info("\n---DataFrame created: chart for YouTube songs (not cleaned up)---\n")
 
 # Combine thumbnail and YouTube links in one column
-for i, row in youtube_chart.iterrows():
-    youtube_chart['thumbnail_standard'][i] = str(youtube_chart['thumbnail_standard'][i]) + ", " + str(youtube_chart['yt_link'][i]) 
+youtube_chart['thumbnail_standard'] = youtube_chart['thumbnail_standard'].astype(str) + ", " + youtube_chart['yt_link'].astype(str)
 
 youtube_chart.drop('yt_link', axis=1, inplace=True)
 
@@ -50,5 +51,13 @@ youtube_chart.index += 1
 youtube_chart_100 = youtube_chart[:100]
 logging.info("\n---Cleaned up DataFrame created: chart for top 100 YouTube songs---\n")
 
-youtube_chart_100.to_csv("data/chart_youtube_%s.csv" % (str(datetime.date.today())), index=None)
-logging.info("\n---CSV created: 'data/chart_youtube_%s'---\n" % (str(datetime.date.today())))
\ No newline at end of file
+save_snapshot(youtube_chart_100, 'chart_youtube', str(datetime.date.today()))
+logging.info("\n---CSV created: 'data/chart_youtube_%s'---\n" % (str(datetime.date.today())))
+
+# Downsize thumbnails to the size shown in the web app
+logging.info("\n---Executing 'cache_thumbnails'...---\n")
+cache_thumbnails(chart_image_urls('chart_youtube', str(datetime.date.today())), CHART_BOX)
+
+# Pre-render the chart served by the web app
+save_chart_html('chart_youtube', str(datetime.date.today()))
+logging.info("\n---HTML created: 'data/chart_youtube_%s'---\n" % (str(datetime.date.today())))
\ No newline at end of file
@@ -1,8 +1,5 @@
-import pandas as pd
 import numpy as np
 import datetime
-import googleapiclient.discovery
-import googleapiclient.errors
 import re
 #import webbrowser as wb
 import requests
@@ -10,7 +7,8 @@ from bs4 import BeautifulSoup
 import warnings
 from pandas.core.common import SettingWithCopyWarning
 import logging
-from user_credentials import Y_API_KEY
+from snapshots import read_snapshot, snapshot_path
+from api_clients import API_MODE, youtube_client
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -18,15 +16,11 @@ logging.basicConfig(level=logging.INFO)
 warnings.simplefilter(action="ignore", category=SettingWithCopyWarning)
 
 # Import data
-song_data = pd.read_csv("data/reddit_top_150_songs_%s.csv" % (str(datetime.date.today())))
+song_data = read_snapshot('reddit_top_150_songs', str(datetime.date.today()))
 logging.critical("\n---DataFrame created from import 'reddit_top_150_songs_%s.csv'---\n" % (str(datetime.date.today())))
 
-# YouTube - direct API Key authentication
-api_service_name = "youtube"
-api_version = "v3"
-DEVELOPER_KEY = Y_API_KEY
-
-yt = googleapiclient.discovery.build(api_service_name, api_version, developerKey=DEVELOPER_KEY)
+# YouTube - direct API Key authentication (or recorded responses, see api_clients.py)
+yt = youtube_client()
 
 logging.critical("\n---Connected to YouTube API---\n")
 
@@ -98,12 +92,13 @@ logging.info("\n---SRC suffix string 2 created---\n")
 youtube_embed_src1 = "https://www.youtube.com/embed/videoseries?list=" + suffix_1
 youtube_embed_src2 = "https://www.youtube.com/embed/videoseries?list=" + suffix_2
 
-# Save src embed links in Python script
-with open('youtube_links.py', 'w') as f:
-    f.write('youtube_embed_src1="%s"\nyoutube_embed_src2="%s"\nplaylist_link_1="%s"\nplaylist_link_2="%s"' %  (youtube_embed_src1, youtube_embed_src2, playlist_link_1, playlist_link_2))
-logging.info("\n---Python file written: YouTube src links and playlist links---\n")
+# Save src embed links in Python script (not for replayed runs, the app would show their links)
+if API_MODE != 'replay':
+    with open('youtube_links.py', 'w') as f:
+        f.write('youtube_embed_src1="%s"\nyoutube_embed_src2="%s"\nplaylist_link_1="%s"\nplaylist_link_2="%s"' %  (youtube_embed_src1, youtube_embed_src2, playlist_link_1, playlist_link_2))
+    logging.info("\n---Python file written: YouTube src links and playlist links---\n")
 
 # Preserve src embed links in text file
-with open('data/youtube_links_%s.txt' % (str(datetime.date.today())), 'w') as f:
+with open(snapshot_path('youtube_links', str(datetime.date.today()), 'txt'), 'w') as f:
     f.write('youtube_embed_src1="%s"\nyoutube_embed_src2="%s"\nplaylist_link_1="%s"\nplaylist_link_2="%s"' %  (youtube_embed_src1, youtube_embed_src2, playlist_link_1, playlist_link_2))
 logging.info("\n---Text file written: YouTube src links and playlist links---\n")
\ No newline at end of file